@@ -18,6 +18,8 @@ const Reviews = require('./review');
 
 const Dealerships = require('./dealership');
 
+const Counters = require('./counter');
+
 try {
   Reviews.deleteMany({}).then(()=>{
     Reviews.insertMany(reviews_data['reviews']);
@@ -36,10 +38,19 @@ app.get('/', async (req, res) => {
     res.send("Welcome to the Mongoose API")
 });
 
-// Express route to fetch all reviews
+// Express route to fetch all reviews.
+// Optional query parameters for incremental sync:
+//   after - only reviews with id greater than this
+//   limit - maximum number of reviews, ordered by id
+//   unscored - only reviews stored without a sentiment label
 app.get('/fetchReviews', async (req, res) => {
   try {
-    const documents = await Reviews.find();
+    const filter = {};
+    if (req.query.after) filter.id = { $gt: Number(req.query.after) };
+    if (req.query.unscored) filter.sentiment = { $in: [null, ''] };
+    let query = Reviews.find(filter).sort({ id: 1 });
+    if (req.query.limit) query = query.limit(Number(req.query.limit));
+    const documents = await query;
     res.json(documents);
   } catch (error) {
     res.status(500).json({ error: 'Error fetching documents' });
@@ -56,10 +67,36 @@ app.get('/fetchReviews/dealer/:id', async (req, res) => {
   }
 });
 
-// Express route to fetch all dealerships
+const DEALER_FIELDS = ['id', 'city', 'state', 'st', 'address', 'zip', 'lat', 'long', 'short_name', 'full_name'];
+
+// Express route to fetch all dealerships.
+// Optional query parameters are applied in MongoDB:
+//   state, city  - exact match
+//   zip          - zip code prefix
+//   after        - only dealers with id greater than this (keyset cursor)
+//   limit        - maximum number of dealers, ordered by id
+//   fields       - comma-separated fields to return (id is always included)
 app.get('/fetchDealers', async (req, res) => {
   try {
-    const documents = await Dealerships.find();
+    const filter = {};
+    if (req.query.state) filter.state = req.query.state;
+    if (req.query.city) filter.city = req.query.city;
+    if (req.query.zip) {
+      const prefix = String(req.query.zip).replace(/[^0-9A-Za-z-]/g, '');
+      filter.zip = { $regex: '^' + prefix };
+    }
+    if (req.query.after) filter.id = { $gt: Number(req.query.after) };
+
+    let projection = null;
+    if (req.query.fields) {
+      const fields = String(req.query.fields).split(',').filter(f => DEALER_FIELDS.includes(f));
+      projection = { _id: 0, id: 1 };
+      fields.forEach(f => { projection[f] = 1; });
+    }
+
+    let query = Dealerships.find(filter, projection).sort({ id: 1 });
+    if (req.query.limit) query = query.limit(Number(req.query.limit));
+    const documents = await query;
     res.json(documents);
   } catch (error) {
     res.status(500).json({ error: 'Error fetching documents' });
@@ -90,14 +127,31 @@ app.get('/fetchDealer/:id', async (req, res) => {
   }
 });
 
-//Express route to insert review
-app.post('/insert_review', express.raw({ type: '*/*' }), async (req, res) => {
-  data = JSON.parse(req.body);
-  const documents = await Reviews.find().sort( { id: -1 } )
-  let new_id = documents[0]['id']+1
+// Reserve count consecutive review ids and return the first of them.
+// The block is taken with a single $inc on the "reviews" counter, so
+// concurrent inserts never hand out the same id. The counter is started
+// from the highest stored id the first time it is needed.
+async function reserveReviewIds(count) {
+  const reserve = () => Counters.findOneAndUpdate(
+    { _id: 'reviews' }, { $inc: { seq: count } }, { new: true });
+  let counter = await reserve();
+  if (!counter) {
+    const last = await Reviews.findOne().sort({ id: -1 }).select({ id: 1 });
+    try {
+      await Counters.create({ _id: 'reviews', seq: last ? last.id : 0 });
+    } catch (error) {
+      // Another request started the counter first
+      if (error.code !== 11000) throw error;
+    }
+    counter = await reserve();
+  }
+  return counter.seq - count + 1;
+}
 
-  const review = new Reviews({
-    "id": new_id,
+// Build a review document with the given id from request data
+function reviewDocument(id, data) {
+  return {
+    "id": id,
     "name": data['name'],
     "dealership": data['dealership'],
     "review": data['review'],
@@ -106,17 +160,119 @@ app.post('/insert_review', express.raw({ type: '*/*' }), async (req, res) => {
     "car_make": data['car_make'],
     "car_model": data['car_model'],
     "car_year": data['car_year'],
-  });
+    "idempotency_key": data['idempotency_key'],
+    "sentiment": data['sentiment'],
+    "sentiment_score": data['sentiment_score'],
+  };
+}
+
+//Express route to insert review.
+// A review carrying an idempotency_key that was already stored is not
+// inserted again; the stored review is returned instead. "created" tells
+// the two apart, so redeliveries are not counted twice.
+app.post('/insert_review', express.raw({ type: '*/*' }), async (req, res) => {
+  data = JSON.parse(req.body);
+  if (data['idempotency_key']) {
+    const existing = await Reviews.findOne({ idempotency_key: data['idempotency_key'] });
+    if (existing) {
+      return res.json({ ...existing.toJSON(), created: false });
+    }
+  }
+
+  const review = new Reviews(reviewDocument(await reserveReviewIds(1), data));
 
   try {
     const savedReview = await review.save();
-    res.json(savedReview);
+    res.json({ ...savedReview.toJSON(), created: true });
   } catch (error) {
     console.log(error);
     res.status(500).json({ error: 'Error inserting review' });
   }
 });
 
+// Express route to insert a batch of reviews in one round trip.
+// Takes a JSON array of reviews and returns the stored reviews in the same
+// order. Ids are reserved as one block per batch, and reviews whose
+// idempotency_key is already stored are returned instead of re-inserted;
+// each result's "created" is false for those.
+app.post('/insert_reviews', express.raw({ type: '*/*', limit: '10mb' }), async (req, res) => {
+  let batch;
+  try {
+    batch = JSON.parse(req.body);
+  } catch (error) {
+    return res.status(400).json({ error: 'Invalid JSON' });
+  }
+  if (!Array.isArray(batch)) {
+    return res.status(400).json({ error: 'Expected an array of reviews' });
+  }
+
+  try {
+    const stored = new Map();
+    const keys = batch.map(data => data['idempotency_key']).filter(Boolean);
+    if (keys.length) {
+      const documents = await Reviews.find({ idempotency_key: { $in: keys } });
+      documents.forEach(document => stored.set(document.idempotency_key, document.toJSON()));
+    }
+
+    // Ids are filled in once the number of new reviews is known
+    const inserts = [];
+    const entries = batch.map(data => {
+      const key = data['idempotency_key'];
+      if (key && stored.has(key)) {
+        return [stored.get(key), false];
+      }
+      const document = reviewDocument(null, data);
+      inserts.push(document);
+      if (key) {
+        stored.set(key, document);
+      }
+      return [document, true];
+    });
+
+    if (inserts.length) {
+      let nextId = await reserveReviewIds(inserts.length);
+      inserts.forEach(document => { document.id = nextId++; });
+      await Reviews.insertMany(inserts);
+    }
+    res.json(entries.map(([document, created]) => ({ ...document, created })));
+  } catch (error) {
+    console.log(error);
+    const status = error.name === 'ValidationError' ? 400 : 500;
+    res.status(status).json({ error: 'Error inserting reviews' });
+  }
+});
+
+// Express route to store sentiment labels of existing reviews.
+// Takes a JSON array of {id, sentiment, sentiment_score}, as sent by the
+// Django backfill_review_sentiments command.
+app.post('/update_sentiments', express.raw({ type: '*/*', limit: '10mb' }), async (req, res) => {
+  let updates;
+  try {
+    updates = JSON.parse(req.body);
+  } catch (error) {
+    return res.status(400).json({ error: 'Invalid JSON' });
+  }
+  if (!Array.isArray(updates)) {
+    return res.status(400).json({ error: 'Expected an array of updates' });
+  }
+
+  try {
+    const result = await Reviews.bulkWrite(updates.map(update => ({
+      updateOne: {
+        filter: { id: update['id'] },
+        update: { $set: {
+          sentiment: update['sentiment'],
+          sentiment_score: update['sentiment_score'],
+        } },
+      },
+    })));
+    res.json({ updated: result.modifiedCount });
+  } catch (error) {
+    console.log(error);
+    res.status(500).json({ error: 'Error updating reviews' });
+  }
+});
+
 // Start the Express server
 app.listen(port, () => {
   console.log(`Server is running on http://localhost:${port}`);
@@ -0,0 +1,17 @@
+const mongoose = require('mongoose');
+
+const Schema = mongoose.Schema;
+
+// Named sequences; "seq" is the last value handed out
+const counters = new Schema({
+  _id: {
+    type: String,
+    required: true,
+  },
+  seq: {
+    type: Number,
+    required: true,
+  },
+});
+
+module.exports = mongoose.model('counters', counters);
@@ -40,4 +40,8 @@ const dealerships = new Schema({
   }
 });
 
+// Support keyset pagination and filtered listing in /fetchDealers
+dealerships.index({ id: 1 });
+dealerships.index({ state: 1, city: 1, id: 1 });
+
 module.exports = mongoose.model('dealerships', dealerships);
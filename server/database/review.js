@@ -39,6 +39,23 @@ const reviews = new Schema({
     type: Number,
     required: true
   },
+  // Set by the Django review outbox so redelivered reviews are stored once
+  idempotency_key: {
+    type: String,
+  },
+  // Sentiment label and VADER compound score, set when the review is
+  // written or by the Django backfill_review_sentiments command
+  sentiment: {
+    type: String,
+  },
+  sentiment_score: {
+    type: Number,
+  },
 });
 
+// Support incremental sync by id and per-dealer lookups; ids are unique
+reviews.index({ id: 1 }, { unique: true });
+reviews.index({ dealership: 1 });
+reviews.index({ idempotency_key: 1 }, { unique: true, sparse: true });
+
 module.exports = mongoose.model('reviews', reviews);
@@ -11,7 +11,7 @@ class CarModelInline(admin.StackedInline):
 
 # CarModelAdmin class
 class CarModelAdmin(admin.ModelAdmin):
-    list_display = ('name', 'make', 'car_type', 'year')
+    list_display = ('name', 'make', 'car_type', 'year', 'mileage')
     list_filter = ['make', 'car_type', 'year']
     search_fields = ['name', 'make__name']
 
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class DjangoappConfig(AppConfig):
     name = 'djangoapp'
+
+    def ready(self):
+        # Register signal handlers.
+        from . import signals  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
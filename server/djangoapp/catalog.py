@@ -0,0 +1,422 @@
+"""
+Car catalog queries, serialization and caching for the get_cars view.
+
+The catalog is read with a constant number of queries regardless of how
+many makes and models exist: one over CarMake and one over CarModel,
+merged in Python on make id and serialized to JSON incrementally.
+
+Serialized responses are cached per query under a catalog version that is
+bumped whenever a CarMake or CarModel is saved or deleted (see signals.py).
+The version is a database row, so a bump made by one worker process (or
+by import_cars) reaches the others within CATALOG_VERSION_TTL seconds;
+only the serialized bodies live in each process's cache.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import time
+
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import CarMake, CarModel, CatalogVersion, new_catalog_token
+
+MODEL_FIELDS = ("id", "name", "car_type", "year", "dealer_id")
+MAKE_FIELDS = ("id", "name", "description")
+
+# Rows fetched per database round trip while streaming.
+CHUNK_SIZE = 2000
+
+
+class QueryParamError(ValueError):
+    """
+    Raised when get_cars or inventory query parameters are invalid.
+    """
+
+
+def _int_param(params, name):
+    """
+    Return query parameter name as an int, or None if absent.
+    """
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise QueryParamError(f"'{name}' must be an integer.") from exc
+
+
+def parse_catalog_query(params):
+    """
+    Validate get_cars query parameters.
+
+    Supported filters: make (name, case-insensitive), type, year_min,
+    year_max and dealer_id. Pagination over makes: page (1-based) and
+    page_size; without page_size the whole catalog is returned.
+    """
+    query = {
+        "make": params.get("make") or None,
+        "car_type": params.get("type") or None,
+        "year_min": _int_param(params, "year_min"),
+        "year_max": _int_param(params, "year_max"),
+        "dealer_id": _int_param(params, "dealer_id"),
+        "page": _int_param(params, "page"),
+        "page_size": _int_param(params, "page_size"),
+    }
+    if query["page"] is None:
+        query["page"] = 1
+    elif query["page"] < 1:
+        raise QueryParamError("'page' must be 1 or greater.")
+    if query["page_size"] is not None and query["page_size"] < 1:
+        raise QueryParamError("'page_size' must be 1 or greater.")
+    return query
+
+
+def _model_queryset(query):
+    """
+    Return the CarModel queryset matching the model-level filters.
+    """
+    models = CarModel.objects.all()
+    if query["car_type"]:
+        models = models.filter(car_type__iexact=query["car_type"])
+    if query["year_min"] is not None:
+        models = models.filter(year__gte=query["year_min"])
+    if query["year_max"] is not None:
+        models = models.filter(year__lte=query["year_max"])
+    if query["dealer_id"] is not None:
+        models = models.filter(dealer_id=query["dealer_id"])
+    return models
+
+
+def _has_model_filters(query):
+    """
+    Return True if any filter narrows the models (and so the makes).
+    """
+    return any(
+        query[key] is not None
+        for key in ("car_type", "year_min", "year_max", "dealer_id")
+    )
+
+
+def catalog_page(query):
+    """
+    Return (makes, models, page_info) for a parsed catalog query.
+
+    makes and models are lazy iterables of dicts ordered by make id, ready
+    for iter_catalog_json; page_info is None when not paginating.
+    """
+    models = _model_queryset(query)
+    makes = CarMake.objects.order_by("id")
+    if query["make"]:
+        makes = makes.filter(name__iexact=query["make"])
+    if _has_model_filters(query):
+        # Only makes with at least one matching model (a subquery).
+        makes = makes.filter(id__in=models.values("make_id"))
+    makes = makes.values(*MAKE_FIELDS)
+
+    page_info = None
+    if query["page_size"] is not None:
+        size = query["page_size"]
+        offset = (query["page"] - 1) * size
+        # Fetch one extra make to learn whether another page exists.
+        makes = list(makes[offset:offset + size + 1])
+        page_info = {
+            "page": query["page"],
+            "page_size": size,
+            "has_next": len(makes) > size,
+        }
+        makes = makes[:size]
+        if not makes:
+            return [], [], page_info
+        models = models.filter(
+            make_id__gte=makes[0]["id"],
+            make_id__lte=makes[-1]["id"],
+        )
+    else:
+        makes = makes.iterator(chunk_size=CHUNK_SIZE)
+        if query["make"]:
+            models = models.filter(make__name__iexact=query["make"])
+
+    models = models.order_by("make_id", "id").values(
+        "make_id",
+        *MODEL_FIELDS,
+    )
+    return makes, models.iterator(chunk_size=CHUNK_SIZE), page_info
+
+
+def _group_models(makes, models):
+    """
+    Merge makes and models (both ordered by make id) into catalog entries.
+
+    Yields one dict per make with its "models" list attached.
+    """
+    models = iter(models)
+    current = next(models, None)
+    for make in makes:
+        make_models = []
+        while current is not None and current["make_id"] <= make["id"]:
+            if current["make_id"] == make["id"]:
+                make_models.append(
+                    {field: current[field] for field in MODEL_FIELDS},
+                )
+            current = next(models, None)
+        yield {**make, "models": make_models}
+
+
+def iter_catalog_json(makes, models, page_info=None):
+    """
+    Serialize the catalog response incrementally, one make at a time.
+
+    Yields str chunks that join into:
+    {"status": 200, "cars": [...], <page_info fields>}
+    """
+    yield '{"status": 200, "cars": ['
+    for index, entry in enumerate(_group_models(makes, models)):
+        yield ("," if index else "") + json.dumps(entry)
+    yield "]"
+    for key, value in (page_info or {}).items():
+        yield f", {json.dumps(key)}: {json.dumps(value)}"
+    yield "}"
+
+
+# -------------------------------------------------------------
+# PER-DEALER INVENTORY
+# -------------------------------------------------------------
+
+INVENTORY_DEFAULT_LIMIT = 50
+INVENTORY_MAX_LIMIT = 200
+# sort parameter -> (field, descending)
+INVENTORY_SORTS = {
+    "id": ("id", False),
+    "year": ("year", False),
+    "-year": ("year", True),
+    "mileage": ("mileage", False),
+    "-mileage": ("mileage", True),
+}
+
+
+def encode_cursor(values):
+    """
+    Return an opaque keyset pagination cursor for a list of values.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Return the list of values encoded in a pagination cursor.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise QueryParamError("'cursor' is invalid.") from exc
+    if not isinstance(values, list):
+        raise QueryParamError("'cursor' is invalid.")
+    return values
+
+
+def parse_inventory_query(params):
+    """
+    Validate inventory query parameters.
+
+    Filters: make, model, body_type (case-insensitive), year_min, year_max
+    and max_mileage. Sorting: sort is one of id, year, -year, mileage or
+    -mileage. Keyset pagination: limit and the cursor from the previous
+    page's next_cursor.
+    """
+    sort = params.get("sort") or "id"
+    if sort not in INVENTORY_SORTS:
+        raise QueryParamError(
+            f"'sort' must be one of: {', '.join(INVENTORY_SORTS)}.",
+        )
+    limit = _int_param(params, "limit") or INVENTORY_DEFAULT_LIMIT
+    if not 1 <= limit <= INVENTORY_MAX_LIMIT:
+        raise QueryParamError(
+            f"'limit' must be between 1 and {INVENTORY_MAX_LIMIT}.",
+        )
+    cursor = params.get("cursor")
+    after = decode_cursor(cursor) if cursor else None
+    # (sort field value, id); every inventory sort field is an integer.
+    if after is not None and (
+        len(after) != 2
+        or not all(
+            isinstance(value, int) and not isinstance(value, bool)
+            for value in after
+        )
+    ):
+        raise QueryParamError("'cursor' is invalid.")
+    return {
+        "make": params.get("make") or None,
+        "model": params.get("model") or None,
+        "body_type": params.get("body_type") or None,
+        "year_min": _int_param(params, "year_min"),
+        "year_max": _int_param(params, "year_max"),
+        "max_mileage": _int_param(params, "max_mileage"),
+        "sort": sort,
+        "limit": limit,
+        "after": after,
+    }
+
+
+def inventory_page(dealer_id, query):
+    """
+    Return (cars, next_cursor) for one page of a dealer's inventory.
+
+    Pages are read with keyset pagination on (sort field, id), so each
+    page is a single indexed range scan however deep the client pages.
+    next_cursor is None on the last page.
+    """
+    cars = CarModel.objects.filter(dealer_id=dealer_id)
+    if query["make"]:
+        cars = cars.filter(make__name__iexact=query["make"])
+    if query["model"]:
+        cars = cars.filter(name__iexact=query["model"])
+    if query["body_type"]:
+        cars = cars.filter(car_type__iexact=query["body_type"])
+    if query["year_min"] is not None:
+        cars = cars.filter(year__gte=query["year_min"])
+    if query["year_max"] is not None:
+        cars = cars.filter(year__lte=query["year_max"])
+    if query["max_mileage"] is not None:
+        cars = cars.filter(mileage__lte=query["max_mileage"])
+
+    field, descending = INVENTORY_SORTS[query["sort"]]
+    if query["after"] is not None:
+        value, last_id = query["after"]
+        op = "lt" if descending else "gt"
+        if field == "id":
+            cars = cars.filter(**{f"id__{op}": last_id})
+        else:
+            cars = cars.filter(
+                Q(**{f"{field}__{op}": value})
+                | Q(**{field: value, f"id__{op}": last_id}),
+            )
+    prefix = "-" if descending else ""
+    ordering = [f"{prefix}{field}"] if field == "id" else [
+        f"{prefix}{field}",
+        f"{prefix}id",
+    ]
+
+    rows = list(
+        cars.order_by(*ordering).values(
+            "id",
+            "dealer_id",
+            "make__name",
+            "name",
+            "car_type",
+            "year",
+            "mileage",
+        )[: query["limit"] + 1],
+    )
+    next_cursor = None
+    if len(rows) > query["limit"]:
+        rows = rows[: query["limit"]]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[field], last["id"]])
+
+    cars = [
+        {
+            "id": row["id"],
+            "dealer_id": row["dealer_id"],
+            "make": row["make__name"],
+            "model": row["name"],
+            "bodyType": row["car_type"],
+            "year": row["year"],
+            "mileage": row["mileage"],
+        }
+        for row in rows
+    ]
+    return cars, next_cursor
+
+
+# -------------------------------------------------------------
+# SERIALIZED CATALOG CACHE
+# -------------------------------------------------------------
+
+CATALOG_CACHE_TIMEOUT = 24 * 60 * 60
+# Seconds a process reuses the catalog version it last read, sparing most
+# get_cars requests a query; 0 reads it on every request.
+CATALOG_VERSION_TTL = float(os.getenv("catalog_version_ttl", default="1"))
+
+# {"current": (expires_at, (token, last_modified))}
+_version_memo = {}
+
+
+def catalog_version():
+    """
+    Return the current catalog version as (token, last_modified).
+
+    token never repeats across versions; last_modified is the Unix time of
+    the last invalidation.
+    """
+    memo = _version_memo.get("current")
+    if memo is not None and memo[0] > time.monotonic():
+        return memo[1]
+    current = _read_catalog_version()
+    _version_memo["current"] = (
+        time.monotonic() + CATALOG_VERSION_TTL,
+        current,
+    )
+    return current
+
+
+def _read_catalog_version():
+    """
+    Read (token, last_modified) from the database.
+    """
+    row = CatalogVersion.objects.filter(pk=1).values_list(
+        "token",
+        "updated_at",
+    ).first()
+    if row is None:
+        current, _ = CatalogVersion.objects.get_or_create(pk=1)
+        row = (current.token, current.updated_at)
+    return row[0], int(row[1].timestamp())
+
+
+def invalidate_catalog():
+    """
+    Bump the catalog version so every cached response is rebuilt.
+
+    Called from the CarMake/CarModel save and delete signals; bulk writes
+    that bypass signals must call it themselves.
+    """
+    bumped = CatalogVersion.objects.filter(pk=1).update(
+        version=F("version") + 1,
+        token=new_catalog_token(),
+        updated_at=timezone.now(),
+    )
+    if not bumped:
+        # No version was ever read, so nothing is cached under one yet.
+        CatalogVersion.objects.get_or_create(pk=1)
+    _version_memo.clear()
+
+
+def cached_catalog(query):
+    """
+    Return (body, etag, last_modified) for a parsed catalog query.
+
+    The response body is serialized once per catalog version and query and
+    then served from the cache as bytes.
+    """
+    token, last_modified = catalog_version()
+    query_key = hashlib.sha256(
+        json.dumps(query, sort_keys=True).encode("utf-8"),
+    ).hexdigest()
+    key = f"djangoapp:catalog:{token}:{query_key}"
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    body = "".join(iter_catalog_json(*catalog_page(query))).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()}"'
+    cached = (body, etag, last_modified)
+    cache.set(key, cached, timeout=CATALOG_CACHE_TIMEOUT)
+    return cached
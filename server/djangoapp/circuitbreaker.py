@@ -0,0 +1,194 @@
+"""
+Per-upstream circuit breakers for the pooled HTTP clients.
+
+Each upstream host gets a breaker that watches the outcome of its recent
+calls. Once too many of them fail (errors, 5xx responses or calls slower
+than the slow-call threshold) the circuit opens and further calls fail
+immediately instead of tying up a worker until the timeout. After a cool
+down a few probe calls are let through (half-open); if they succeed the
+circuit closes again, otherwise it re-opens.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+# Number of recent calls the failure rate is computed over.
+CIRCUIT_WINDOW = int(os.getenv("circuit_window", default="20"))
+# The circuit never opens before this many calls are in the window.
+CIRCUIT_MIN_CALLS = int(os.getenv("circuit_min_calls", default="10"))
+CIRCUIT_FAILURE_RATE = float(os.getenv("circuit_failure_rate", default="0.5"))
+# Seconds an open circuit rejects calls before letting probes through.
+CIRCUIT_OPEN_SECONDS = float(os.getenv("circuit_open_seconds", default="30"))
+CIRCUIT_HALF_OPEN_CALLS = int(
+    os.getenv("circuit_half_open_calls", default="1"),
+)
+# Calls slower than this many seconds count as failures.
+CIRCUIT_SLOW_CALL = float(os.getenv("circuit_slow_call", default="5"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker over a count-based window of outcomes.
+
+    Call allow() before each call and record() with its outcome after it,
+    or release() if it ended without one.
+    """
+
+    def __init__(
+        self,
+        window=CIRCUIT_WINDOW,
+        min_calls=CIRCUIT_MIN_CALLS,
+        failure_rate=CIRCUIT_FAILURE_RATE,
+        open_seconds=CIRCUIT_OPEN_SECONDS,
+        half_open_calls=CIRCUIT_HALF_OPEN_CALLS,
+        clock=time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._counters = {
+            "successes": 0,
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0,
+        }
+
+    def _open(self):
+        """
+        Open the circuit. Must be called with the lock held.
+        """
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probes = 0
+        self._counters["opened"] += 1
+
+    def allow(self):
+        """
+        Return True if a call may be made now, False to fail fast.
+        """
+        with self._lock:
+            if (
+                self._state == OPEN
+                and self._clock() - self._opened_at >= self.open_seconds
+            ):
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            if self._state != CLOSED:
+                self._counters["rejected"] += 1
+                return False
+            return True
+
+    def record(self, success):
+        """
+        Record the outcome of a call allowed by allow().
+        """
+        with self._lock:
+            self._counters["successes" if success else "failures"] += 1
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+                if success:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            if self._state != CLOSED:
+                # A call that started before the circuit opened.
+                return
+
+            self._outcomes.append(success)
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                self._open()
+
+    def release(self):
+        """
+        Give back the slot of a call allowed by allow() that ended without
+        an outcome (e.g. it was cancelled), so a half-open circuit can
+        send another probe instead of rejecting every call.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    @property
+    def state(self):
+        """
+        The current state: closed, open or half_open.
+        """
+        with self._lock:
+            if (
+                self._state == OPEN
+                and self._clock() - self._opened_at >= self.open_seconds
+            ):
+                return HALF_OPEN
+            return self._state
+
+    def stats(self):
+        """
+        Return the state, current failure rate and outcome counters.
+        """
+        state = self.state
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            return {
+                **self._counters,
+                "state": state,
+                "window_calls": calls,
+                "failure_rate": failures / calls if calls else 0.0,
+            }
+
+
+class CircuitBreakers:
+    """
+    One CircuitBreaker per upstream host, created on first use.
+    """
+
+    def __init__(self, slow_call=CIRCUIT_SLOW_CALL, **breaker_options):
+        self.slow_call = slow_call
+        self._breaker_options = breaker_options
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, host):
+        """
+        Return the breaker for host.
+        """
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    **self._breaker_options,
+                )
+            return breaker
+
+    def succeeded(self, status_code, elapsed):
+        """
+        Return whether a response counts as a success for its breaker.
+        """
+        return status_code < 500 and elapsed < self.slow_call
+
+    def stats(self):
+        """
+        Return breaker statistics for every host.
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.stats() for host, breaker in breakers.items()}
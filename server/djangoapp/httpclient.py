@@ -0,0 +1,419 @@
+"""
+Pooled, keep-alive HTTP clients shared by the backend proxy calls.
+
+Each upstream host (the Express backend, the sentiment service) gets its
+own urllib3 connection pool, so connections are reused across requests
+instead of being opened and torn down on every proxied call. An httpx
+based async client with the same limits serves the async views; under
+WSGI its per-loop clients are closed when the view returns (see
+closes_async_client).
+
+Both clients share one circuit breaker per host (see circuitbreaker.py):
+while a host's circuit is open, requests to it fail immediately with
+CircuitOpenError / AsyncCircuitOpenError instead of waiting for timeouts.
+Every call's duration is recorded in the upstream_request_duration_seconds
+histogram by host, endpoint, method and status.
+"""
+
+import asyncio
+import functools
+import os
+import re
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from django.core.handlers.asgi import ASGIRequest
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .circuitbreaker import CircuitBreakers
+from .metrics import UPSTREAM_DURATION
+
+POOL_CONNECTIONS = int(os.getenv("http_pool_connections", default="10"))
+POOL_MAXSIZE = int(os.getenv("http_pool_maxsize", default="20"))
+RETRY_TOTAL = int(os.getenv("http_retry_total", default="2"))
+RETRY_BACKOFF = float(os.getenv("http_retry_backoff", default="0.2"))
+CONNECT_TIMEOUT = float(os.getenv("http_connect_timeout", default="3.05"))
+READ_TIMEOUT = float(os.getenv("http_read_timeout", default="10"))
+
+# Only idempotent requests are retried on failure.
+RETRY_METHODS = frozenset({"GET", "HEAD"})
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Raised instead of sending a request while the host's circuit is open.
+    """
+
+
+class AsyncCircuitOpenError(httpx.TransportError):
+    """
+    Async client counterpart of CircuitOpenError.
+    """
+
+
+def _host(url):
+    """
+    Return the scheme://netloc a URL is pooled and circuit-broken by.
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _endpoint(url, endpoint):
+    """
+    Return the endpoint metrics label for a request: endpoint if given,
+    else the URL path with numeric ids replaced by :id.
+    """
+    return endpoint or re.sub(r"/\d+(?=/|$)", "/:id", urlsplit(url).path)
+
+
+def _record_call(breakers, url, method, endpoint, started, status_code):
+    """
+    Feed a finished call to its host's circuit breaker and the upstream
+    latency histogram; status_code is None when the call raised.
+    """
+    host = _host(url)
+    elapsed = time.monotonic() - started
+    breakers.get(host).record(
+        status_code is not None and breakers.succeeded(status_code, elapsed),
+    )
+    UPSTREAM_DURATION.observe(
+        elapsed,
+        host,
+        _endpoint(url, endpoint),
+        method,
+        "error" if status_code is None else str(status_code),
+    )
+
+
+def _reject_call(url, method, endpoint):
+    """
+    Record a call refused because its host's circuit is open.
+    """
+    UPSTREAM_DURATION.observe(
+        0.0,
+        _host(url),
+        _endpoint(url, endpoint),
+        method,
+        "circuit_open",
+    )
+
+
+class PooledClient:
+    """
+    Thread-safe HTTP client with one connection pool per upstream host.
+
+    Adapters (and therefore connection pools) are shared between threads;
+    each thread gets its own lightweight ``requests.Session`` mounting them.
+    """
+
+    def __init__(
+        self,
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        retries=RETRY_TOTAL,
+        backoff=RETRY_BACKOFF,
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        breakers=None,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.breakers = breakers or CircuitBreakers()
+        self._adapters = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _make_adapter(self):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False,
+        )
+        return HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+
+    def _adapter_for(self, host):
+        with self._lock:
+            adapter = self._adapters.get(host)
+            if adapter is None:
+                adapter = self._make_adapter()
+                self._adapters[host] = adapter
+                self._counters[host] = {"requests": 0, "errors": 0}
+            return adapter
+
+    def _session_for(self, url):
+        host = _host(url)
+        sessions = getattr(self._local, "sessions", None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+
+        session = sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            session.mount(f"{host}/", self._adapter_for(host))
+            sessions[host] = session
+        return host, session
+
+    def _count(self, host, key):
+        with self._lock:
+            self._counters[host][key] += 1
+
+    def request(self, method, url, timeout=None, endpoint=None, **kwargs):
+        """
+        Send a request through the pool for the URL's host.
+
+        endpoint overrides the metrics label derived from the URL path, for
+        paths that embed free-form values.
+
+        Raises ``requests.exceptions.RequestException`` on network errors,
+        and ``CircuitOpenError`` without sending while the circuit is open.
+        """
+        host, session = self._session_for(url)
+        if not self.breakers.get(host).allow():
+            _reject_call(url, method, endpoint)
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        self._count(host, "requests")
+        started = time.monotonic()
+        try:
+            response = session.request(
+                method,
+                url,
+                timeout=timeout or self.timeout,
+                **kwargs,
+            )
+        except requests.exceptions.RequestException:
+            self._count(host, "errors")
+            _record_call(self.breakers, url, method, endpoint, started, None)
+            raise
+        except BaseException:
+            # No outcome to record; free a half-open probe slot.
+            self.breakers.get(host).release()
+            raise
+        _record_call(
+            self.breakers,
+            url,
+            method,
+            endpoint,
+            started,
+            response.status_code,
+        )
+        return response
+
+    def get(self, url, params=None, timeout=None, endpoint=None):
+        """Send a GET request (retried with backoff on failure)."""
+        return self.request(
+            "GET",
+            url,
+            params=params,
+            timeout=timeout,
+            endpoint=endpoint,
+        )
+
+    def post(self, url, json=None, timeout=None, endpoint=None):
+        """Send a POST request (never retried once sent)."""
+        return self.request(
+            "POST",
+            url,
+            json=json,
+            timeout=timeout,
+            endpoint=endpoint,
+        )
+
+    def stats(self):
+        """
+        Return per-host pool statistics for monitoring.
+
+        ``connections_opened`` versus ``pool_requests`` shows how well
+        connections are being reused.
+        """
+        with self._lock:
+            adapters = dict(self._adapters)
+            counters = {host: dict(c) for host, c in self._counters.items()}
+
+        result = {}
+        for host, adapter in adapters.items():
+            opened = 0
+            served = 0
+            available = 0
+            manager = adapter.poolmanager
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                served += pool.num_requests
+                available += pool.pool.qsize() if pool.pool else 0
+            result[host] = {
+                **counters.get(host, {}),
+                "connections_opened": opened,
+                "pool_requests": served,
+                "available_slots": available,
+                "pool_maxsize": self.pool_maxsize,
+            }
+        return result
+
+
+class AsyncPooledClient:
+    """
+    Async counterpart of ``PooledClient`` built on ``httpx.AsyncClient``.
+
+    httpx connections belong to the event loop that opened them, so one
+    client is kept per running loop. Under ASGI that is a single client per
+    worker process; under WSGI each async view runs on its own loop, and
+    aclose() must be called before that loop finishes.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize=POOL_MAXSIZE,
+        retries=RETRY_TOTAL,
+        backoff=RETRY_BACKOFF,
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        breakers=None,
+    ):
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.breakers = breakers or CircuitBreakers()
+        self._clients = weakref.WeakKeyDictionary()
+
+    def _client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize,
+                ),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """
+        Close the running loop's client, if it opened one.
+        """
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def _send(self, method, url, endpoint=None, **kwargs):
+        """
+        Send one request through the host's circuit breaker.
+
+        Raises ``AsyncCircuitOpenError`` without sending while the circuit
+        is open.
+        """
+        host = _host(url)
+        if not self.breakers.get(host).allow():
+            _reject_call(url, method, endpoint)
+            raise AsyncCircuitOpenError(f"Circuit open for {host}")
+
+        started = time.monotonic()
+        try:
+            response = await self._client().request(method, url, **kwargs)
+        except httpx.HTTPError:
+            _record_call(self.breakers, url, method, endpoint, started, None)
+            raise
+        except BaseException:
+            # Cancelled (e.g. the client went away) before an outcome: free
+            # a half-open probe slot, or the circuit never closes again.
+            self.breakers.get(host).release()
+            raise
+        _record_call(
+            self.breakers,
+            url,
+            method,
+            endpoint,
+            started,
+            response.status_code,
+        )
+        return response
+
+    async def get(self, url, params=None, timeout=None, endpoint=None):
+        """
+        Send a GET request, retrying with backoff on network errors and
+        gateway failures.
+
+        Raises ``httpx.HTTPError`` once retries are exhausted, and
+        ``AsyncCircuitOpenError`` as soon as the circuit opens.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = await self._send(
+                    "GET",
+                    url,
+                    endpoint=endpoint,
+                    params=params,
+                    timeout=timeout or self.timeout,
+                )
+            except AsyncCircuitOpenError:
+                raise
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+            else:
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt >= self.retries
+                ):
+                    return response
+            await asyncio.sleep(self.backoff * (2**attempt))
+            attempt += 1
+
+    async def post(self, url, json=None, timeout=None, endpoint=None):
+        """Send a POST request (never retried)."""
+        return await self._send(
+            "POST",
+            url,
+            endpoint=endpoint,
+            json=json,
+            timeout=timeout or self.timeout,
+        )
+
+
+def closes_async_client(view):
+    """
+    Close the async client an async view used once it returns, unless the
+    request is served under ASGI.
+
+    The WSGI handler runs each async view on a fresh event loop, so the
+    client (and its sockets) opened on that loop would otherwise never be
+    closed. Under ASGI the loop lives as long as the worker and its client
+    is kept for the next request.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        finally:
+            if not isinstance(request, ASGIRequest):
+                await async_client.aclose()
+
+    return wrapper
+
+
+circuit_breakers = CircuitBreakers()
+client = PooledClient(breakers=circuit_breakers)
+async_client = AsyncPooledClient(breakers=circuit_breakers)
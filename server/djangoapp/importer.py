@@ -0,0 +1,259 @@
+"""
+Bulk importer for car_records.json-shaped inventory files.
+
+Records are streamed from disk, makes are deduplicated, and models are
+written with bulk_create in fixed-size batches, one transaction per batch.
+Re-running an import is idempotent: makes are matched by name, ignoring
+case, and each model already stored (same make, name, type, year, dealer
+and mileage) accounts for one matching record, which is skipped. Records
+of distinct inventory units sharing those values are all kept.
+"""
+
+import json
+import time
+from collections import Counter
+
+from django.db import transaction
+
+from .catalog import invalidate_catalog
+from .models import CarMake, CarModel
+
+DEFAULT_BATCH_SIZE = 1000
+READ_SIZE = 64 * 1024
+
+# Body types in inventory files that map onto a different car_type.
+BODY_TYPE_ALIASES = {
+    "pickup": CarModel.TRUCK,
+}
+CAR_TYPES = {choice.lower(): choice for choice, _ in CarModel.TYPE_CHOICES}
+
+
+def iter_json_records(path, key="cars"):
+    """
+    Yield the objects of the array under key in a JSON file, one at a time.
+
+    Only the current record (plus a read buffer) is held in memory, so
+    files of any size can be imported. A file whose top level is an array
+    is read directly.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as handle:
+        buffer = ""
+        eof = False
+
+        def fill():
+            nonlocal buffer, eof
+            chunk = handle.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+
+        # Find the opening bracket of the records array.
+        while True:
+            fill()
+            stripped = buffer.lstrip()
+            if stripped.startswith("["):
+                start = buffer.index("[")
+                break
+            marker = buffer.find(f'"{key}"')
+            if marker != -1 and "[" in buffer[marker:]:
+                start = buffer.index("[", marker)
+                break
+            if eof:
+                raise ValueError(f"No '{key}' array found in {path}")
+        buffer = buffer[start + 1:]
+
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            yield record
+            buffer = buffer[end:]
+            if not buffer and not eof:
+                fill()
+
+
+def _car_type(body_type):
+    """
+    Return the CarModel car_type for an inventory bodyType, or None.
+    """
+    body_type = (body_type or "").strip().lower()
+    return BODY_TYPE_ALIASES.get(body_type) or CAR_TYPES.get(body_type)
+
+
+def _model_key(make_id, name, car_type, year, dealer_id, mileage):
+    """
+    Return the natural key identifying an imported CarModel.
+    """
+    return (make_id, name, car_type, year, dealer_id, mileage)
+
+
+class CarImporter:
+    """
+    Import car records into CarMake/CarModel in batches.
+
+    Use import_path() for a file or import_records() for any iterable of
+    record dicts; counters are available in stats afterwards.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.makes = {}
+        self.existing = Counter()
+        self.stats = {
+            "records": 0,
+            "makes_created": 0,
+            "models_created": 0,
+            "duplicates": 0,
+            "skipped": 0,
+            "seconds": 0.0,
+        }
+
+    def _load_existing(self):
+        """
+        Load make ids by name and how many models are stored per key.
+        """
+        self.makes = {
+            name.lower(): pk
+            for pk, name in CarMake.objects.values_list("pk", "name")
+        }
+        self.existing = Counter(
+            _model_key(*row)
+            for row in CarModel.objects.values_list(
+                "make_id",
+                "name",
+                "car_type",
+                "year",
+                "dealer_id",
+                "mileage",
+            ).iterator()
+        )
+
+    def _make_ids(self, names):
+        """
+        Return {lowercased name: id} for names, creating missing makes.
+        """
+        missing = {}
+        for name in names:
+            if name.lower() not in self.makes:
+                missing.setdefault(name.lower(), name)
+        if missing:
+            # Upsert on the unique make name: makes created concurrently
+            # (or since _load_existing) are left as they are.
+            before = CarMake.objects.count()
+            CarMake.objects.bulk_create(
+                (
+                    CarMake(name=name, description="")
+                    for name in missing.values()
+                ),
+                ignore_conflicts=True,
+            )
+            self.stats["makes_created"] += CarMake.objects.count() - before
+            # Re-read every make: the unique constraint ignores case, so a
+            # conflicting name may be stored with different case.
+            self.makes.update(
+                (name.lower(), pk)
+                for pk, name in CarMake.objects.values_list("pk", "name")
+            )
+        return self.makes
+
+    def _valid(self, record):
+        """
+        Return (make, model, car_type, year, dealer_id, mileage), or None
+        if the record is invalid.
+        """
+        try:
+            make = str(record["make"]).strip()
+            model = str(record["model"]).strip()
+            year = int(record["year"])
+            dealer_id = int(record.get("dealer_id") or 0)
+            mileage = int(record.get("mileage") or 0)
+        except (KeyError, TypeError, ValueError):
+            return None
+        car_type = _car_type(record.get("bodyType"))
+        if not make or not model or car_type is None:
+            return None
+        if not 2015 <= year <= 2023 or mileage < 0:
+            return None
+        return make, model, car_type, year, dealer_id, mileage
+
+    def _write_batch(self, batch):
+        """
+        Insert one batch of validated records in a single transaction.
+        """
+        with transaction.atomic():
+            make_ids = self._make_ids({row[0] for row in batch})
+            new_models = []
+            for make, model, car_type, year, dealer_id, mileage in batch:
+                key = _model_key(
+                    make_ids[make.lower()],
+                    model,
+                    car_type,
+                    year,
+                    dealer_id,
+                    mileage,
+                )
+                # A model stored before this import stands for one record;
+                # models created by this import never match.
+                if self.existing[key]:
+                    self.existing[key] -= 1
+                    self.stats["duplicates"] += 1
+                    continue
+                new_models.append(
+                    CarModel(
+                        make_id=key[0],
+                        name=model,
+                        car_type=car_type,
+                        year=year,
+                        dealer_id=dealer_id,
+                        mileage=mileage,
+                    ),
+                )
+            CarModel.objects.bulk_create(new_models)
+            self.stats["models_created"] += len(new_models)
+
+    def import_records(self, records):
+        """
+        Import an iterable of car record dicts and return the stats.
+        """
+        started = time.perf_counter()
+        self._load_existing()
+        batch = []
+        for record in records:
+            self.stats["records"] += 1
+            row = self._valid(record)
+            if row is None:
+                self.stats["skipped"] += 1
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch)
+                batch = []
+        if batch:
+            self._write_batch(batch)
+
+        # bulk_create does not send post_save, so drop get_cars caches here.
+        invalidate_catalog()
+        self.stats["seconds"] = time.perf_counter() - started
+        return self.stats
+
+    def import_path(self, path):
+        """
+        Stream and import a car_records.json-shaped file.
+        """
+        return self.import_records(iter_json_records(path))
+
+
+def rows_per_second(stats):
+    """
+    Return the import rate in records per second.
+    """
+    if not stats["seconds"]:
+        return 0.0
+    return stats["records"] / stats["seconds"]
@@ -0,0 +1,355 @@
+"""
+Load-test harness for the proxy and local-data endpoints.
+
+Local stand-ins for the Node backend (serving the dealerships and reviews
+in database/data) and for the sentiment service are started on free ports
+with a configurable injected latency, restapis is pointed at them, and
+each scenario drives one endpoint through the full Django stack (URL
+routing, middleware, views) from a fixed number of concurrent workers.
+Used by the bench_endpoints command.
+"""
+
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from django.db import connections
+from django.test import Client
+
+from .middleware import _QueryCounter
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "database",
+    "data",
+)
+
+
+def load_data(data_dir=DATA_DIR):
+    """
+    Return (dealerships, reviews) from the backend's seed data.
+    """
+    loaded = {}
+    for name in ("dealerships", "reviews"):
+        path = os.path.join(data_dir, f"{name}.json")
+        with open(path, encoding="utf-8") as data_file:
+            loaded[name] = json.load(data_file)[name]
+    return loaded["dealerships"], loaded["reviews"]
+
+
+# -------------------------------------------------------------
+# UPSTREAM STAND-INS
+# -------------------------------------------------------------
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """
+    Base handler: JSON responses after the server's injected latency.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, body, status=200):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _pause(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class _BackendHandler(_StandInHandler):
+    """
+    The read and insert endpoints of the Node backend, over seed data.
+    """
+
+    def _dealers(self, query):
+        dealers = [
+            dealer
+            for dealer in self.server.dealerships
+            if (not query.get("state") or dealer["state"] == query["state"])
+            and (not query.get("city") or dealer["city"] == query["city"])
+            and dealer["zip"].startswith(query.get("zip", ""))
+            and (not query.get("after") or dealer["id"] > int(query["after"]))
+        ]
+        if query.get("fields"):
+            fields = ["id", *query["fields"].split(",")]
+            dealers = [
+                {field: dealer.get(field) for field in fields}
+                for dealer in dealers
+            ]
+        if query.get("limit"):
+            dealers = dealers[:int(query["limit"])]
+        return dealers
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._pause()
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = unquote(url.path).strip("/").split("/")
+
+        if parts == ["fetchDealers"]:
+            return self._send(self._dealers(query))
+        if parts[0] == "fetchDealers" and len(parts) == 2:
+            return self._send(self._dealers({"state": parts[1]}))
+        if parts[0] == "fetchDealer" and len(parts) == 2:
+            dealer = self.server.dealers_by_id.get(int(parts[1]))
+            if dealer is None:
+                return self._send({"error": "Dealer not found"}, 404)
+            return self._send(dealer)
+        if parts == ["fetchReviews"]:
+            reviews = [
+                review
+                for review in self.server.reviews
+                if not query.get("after") or review["id"] > int(query["after"])
+            ]
+            if query.get("limit"):
+                reviews = reviews[:int(query["limit"])]
+            return self._send(reviews)
+        if parts[:2] == ["fetchReviews", "dealer"] and len(parts) == 3:
+            return self._send(
+                self.server.reviews_by_dealer.get(int(parts[2]), []),
+            )
+        return self._send({"error": "Not found"}, 404)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self._pause()
+        body = self._read_json()
+        if self.path == "/insert_review":
+            return self._send({**body, "id": self.server.next_ids(1)})
+        if self.path == "/insert_reviews":
+            first = self.server.next_ids(len(body))
+            return self._send(
+                [{**review, "id": first + i} for i, review in enumerate(body)],
+            )
+        return self._send({"error": "Not found"}, 404)
+
+
+class _SentimentHandler(_StandInHandler):
+    """
+    The sentiment service's endpoints, answering with a fixed label.
+    """
+
+    result = {
+        "sentiment": "neutral",
+        "scores": {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0},
+    }
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._pause()
+        if self.path.startswith("/analyze/"):
+            return self._send(self.result)
+        return self._send({"error": "Not found"}, 404)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self._pause()
+        if self.path == "/analyze/batch":
+            texts = self._read_json()["texts"]
+            return self._send({"results": [self.result for _ in texts]})
+        return self._send({"error": "Not found"}, 404)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in for an upstream service on a free local port.
+
+    Every request sleeps latency seconds before it is answered.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler, latency=0.0, dealerships=(), reviews=()):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency
+        self.dealerships = sorted(dealerships, key=lambda d: d["id"])
+        self.dealers_by_id = {dealer["id"]: dealer for dealer in dealerships}
+        self.reviews = sorted(reviews, key=lambda r: r["id"])
+        self.reviews_by_dealer = {}
+        for review in self.reviews:
+            self.reviews_by_dealer.setdefault(review["dealership"], []).append(
+                review,
+            )
+        self._next_id = max((r["id"] for r in self.reviews), default=0) + 1
+        self._id_lock = threading.Lock()
+
+    @property
+    def url(self):
+        """
+        The base URL the server listens on.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_ids(self, count):
+        """
+        Allocate count review ids and return the first.
+        """
+        with self._id_lock:
+            first = self._next_id
+            self._next_id += count
+            return first
+
+    def start(self):
+        """
+        Serve on a daemon thread and return self.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def start_backend(latency=0.0, data_dir=DATA_DIR):
+    """
+    Start a stand-in Node backend serving the seed data.
+    """
+    dealerships, reviews = load_data(data_dir)
+    return StandInServer(
+        _BackendHandler,
+        latency,
+        dealerships,
+        reviews,
+    ).start()
+
+
+def start_sentiment_service(latency=0.0):
+    """
+    Start a stand-in sentiment service.
+    """
+    return StandInServer(_SentimentHandler, latency).start()
+
+
+# -------------------------------------------------------------
+# LOAD DRIVER
+# -------------------------------------------------------------
+
+
+def percentile(ordered, fraction):
+    """
+    Return the nearest-rank percentile of an ascending list.
+    """
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies, queries, errors, elapsed):
+    """
+    Return a scenario's throughput, latency percentiles (ms) and query
+    counts.
+    """
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "db_queries_mean": sum(queries) / len(queries) if queries else 0.0,
+        "db_queries_max": max(queries, default=0),
+    }
+
+
+def run_scenario(
+    send,
+    requests,
+    concurrency,
+    *,
+    user=None,
+    seed=0,
+    before=None,
+):
+    """
+    Call send(client, rng) requests times from concurrency worker threads.
+
+    Each worker has its own test Client (logged in as user, if given) and
+    random generator. send returns the response; statuses of 400 and
+    above count as errors. before, if given, is called ahead of each
+    request and is not timed. Returns the summarize() figures.
+    """
+    counter = iter(range(requests))
+    counter_lock = threading.Lock()
+    latencies, queries = [], []
+    errors = [0]
+    results_lock = threading.Lock()
+
+    def worker(index):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        rng = random.Random(seed * 1000 + index)
+        try:
+            while True:
+                with counter_lock:
+                    if next(counter, None) is None:
+                        return
+                if before is not None:
+                    before()
+                with _QueryCounter() as counted:
+                    started = time.perf_counter()
+                    response = send(client, rng)
+                    elapsed = time.perf_counter() - started
+                with results_lock:
+                    latencies.append(elapsed)
+                    queries.append(counted.count)
+                    errors[0] += response.status_code >= 400
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, i) for i in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, queries, errors[0], elapsed)
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Compare results with a baseline and return a message per regression.
+
+    A scenario regresses when its p95 latency grows, or its throughput
+    drops, by more than tolerance (a fraction), when it issues more
+    database queries per request than the baseline, or when any of its
+    requests failed.
+    """
+    regressions = []
+    for name, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests")
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.1f} ms vs baseline "
+                f"{expected['p95_ms']:.1f} ms",
+            )
+        if result["throughput"] < expected["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['throughput']:.1f} req/s vs baseline "
+                f"{expected['throughput']:.1f} req/s",
+            )
+        if result["db_queries_max"] > expected["db_queries_max"]:
+            regressions.append(
+                f"{name}: {result['db_queries_max']} queries per request vs "
+                f"baseline {expected['db_queries_max']}",
+            )
+    return regressions
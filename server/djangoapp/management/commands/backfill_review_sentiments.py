@@ -0,0 +1,101 @@
+"""
+Score the backend's reviews that were stored without a sentiment label.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from djangoapp.restapis import (
+    get_request,
+    score_reviews,
+    update_review_sentiments,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Score every review stored without a sentiment label, in parallel "
+        "batches, and store the labels and compound scores in the backend "
+        "so reads no longer call the sentiment service."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=1000,
+            help="Reviews fetched per backend request.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Reviews scored and stored per sentiment/backend call.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Batches processed concurrently.",
+        )
+
+    def fetch_unscored(self, page_size):
+        reviews = []
+        after = 0
+        while True:
+            page = get_request(
+                "/fetchReviews",
+                after=after,
+                limit=page_size,
+                unscored=1,
+            )
+            if page is None:
+                raise CommandError("Could not fetch reviews from the backend.")
+            # Older backends ignore "unscored"; skip labelled reviews here.
+            reviews.extend(r for r in page if not r.get("sentiment"))
+            # Stop on a short page, or if the backend ignored "after".
+            last = max((review["id"] for review in page), default=after)
+            if len(page) < page_size or last <= after:
+                return reviews
+            after = last
+
+    @staticmethod
+    def backfill(batch):
+        """
+        Score and store one batch; return how many reviews were labelled.
+        """
+        try:
+            scored = [
+                review
+                for review in score_reviews(batch)
+                if review.get("sentiment")
+            ]
+            if scored and not update_review_sentiments(scored):
+                return 0
+            return len(scored)
+        finally:
+            # Replica write-through runs on this worker thread.
+            connection.close()
+
+    def handle(self, *args, **options):
+        reviews = self.fetch_unscored(options["page_size"])
+        size = options["batch_size"]
+        batches = [
+            reviews[start:start + size]
+            for start in range(0, len(reviews), size)
+        ]
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            labelled = sum(pool.map(self.backfill, batches))
+
+        message = (
+            f"Stored sentiment for {labelled} of {len(reviews)} "
+            "unscored reviews."
+        )
+        if labelled < len(reviews):
+            raise CommandError(
+                f"{message} Scoring or storing failed for the rest; run "
+                "the command again to retry them.",
+            )
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,291 @@
+"""
+Load-test the proxy and local-data endpoints against local stand-ins for
+the backend and the sentiment service.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from djangoapp import outbox, restapis
+from djangoapp.catalog import invalidate_catalog
+from djangoapp.loadtest import (
+    find_regressions,
+    load_data,
+    run_scenario,
+    start_backend,
+    start_sentiment_service,
+)
+from djangoapp.microservices.sentiment_cache import SentimentCache
+from djangoapp.models import ReviewSubmission
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "endpoints.json"
+BENCH_USERNAME = "bench_endpoints"
+
+# Options that change what is measured; a baseline is only compared
+# against runs made with the same values.
+RUN_OPTIONS = (
+    "requests",
+    "concurrency",
+    "backend_latency",
+    "sentiment_latency",
+    "cold",
+    "data_source",
+)
+
+
+def scenarios(dealerships, reviews):
+    """
+    Return {name: send(client, rng)} for every benchmarked endpoint.
+    """
+    dealer_ids = [dealer["id"] for dealer in dealerships]
+    reviewed_ids = sorted({review["dealership"] for review in reviews})
+    states = sorted({dealer["state"] for dealer in dealerships})
+
+    def get_dealers(client, rng):
+        if rng.random() < 0.5:
+            return client.get("/djangoapp/get_dealers")
+        state = quote(rng.choice(states))
+        return client.get(f"/djangoapp/get_dealers/{state}")
+
+    def dealer(client, rng):
+        return client.get(f"/djangoapp/dealer/{rng.choice(dealer_ids)}")
+
+    def dealer_reviews(client, rng):
+        return client.get(
+            f"/djangoapp/reviews/dealer/{rng.choice(reviewed_ids)}",
+        )
+
+    def get_cars(client, rng):
+        if rng.random() < 0.5:
+            return client.get("/djangoapp/get_cars")
+        return client.get("/djangoapp/get_cars?type=SUV&year_min=2020")
+
+    def add_review(client, rng):
+        template = rng.choice(reviews)
+        review = {
+            key: template[key]
+            for key in (
+                "dealership",
+                "review",
+                "purchase",
+                "purchase_date",
+                "car_make",
+                "car_model",
+                "car_year",
+            )
+        }
+        return client.post(
+            "/djangoapp/add_review",
+            json.dumps(review),
+            content_type="application/json",
+        )
+
+    return {
+        "get_dealers": get_dealers,
+        "dealer": dealer,
+        "reviews": dealer_reviews,
+        "get_cars": get_cars,
+        "add_review": add_review,
+    }
+
+
+def clear_caches():
+    """
+    Empty the proxy response cache and the car catalog cache.
+    """
+    restapis.response_cache.clear()
+    invalidate_catalog()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive get_dealers, dealer/<id>, reviews/dealer/<id>, get_cars and "
+        "add_review at a fixed concurrency against local stand-ins for the "
+        "backend and sentiment service, report throughput, latency "
+        "percentiles and DB queries per request, and fail on regressions "
+        "against a baseline file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            nargs="+",
+            choices=list(scenarios([], [])),
+            help="Scenarios to run (default: all).",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=400,
+            help="Requests per scenario.",
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--backend-latency",
+            type=float,
+            default=20,
+            help="Milliseconds the stand-in backend waits before answering.",
+        )
+        parser.add_argument(
+            "--sentiment-latency",
+            type=float,
+            default=5,
+            help="Milliseconds the stand-in sentiment service waits.",
+        )
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Clear the response and catalog caches before every "
+            "request instead of once per scenario.",
+        )
+        parser.add_argument(
+            "--data-source",
+            choices=["remote", "replica"],
+            default="remote",
+            help="Where dealer and review reads are served from.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--baseline",
+            default=str(DEFAULT_BASELINE),
+            help="Baseline file to compare against (or write).",
+        )
+        parser.add_argument(
+            "--write-baseline",
+            action="store_true",
+            help="Store this run's results as the new baseline.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed fractional p95 increase or throughput drop.",
+        )
+
+    def handle(self, *args, **options):
+        dealerships, reviews = load_data()
+        names = options["scenario"] or list(scenarios([], []))
+        run_options = {name: options[name] for name in RUN_OPTIONS}
+
+        backend = start_backend(options["backend_latency"] / 1000)
+        sentiment = start_sentiment_service(
+            options["sentiment_latency"] / 1000,
+        )
+        user, created = User.objects.get_or_create(username=BENCH_USERNAME)
+        results = {}
+        try:
+            with ExitStack() as stack:
+                cache_dir = stack.enter_context(tempfile.TemporaryDirectory())
+                stack.enter_context(
+                    override_settings(ALLOWED_HOSTS=["testserver"]),
+                )
+                for name, value in {
+                    "BACKEND_URL": backend.url,
+                    "SENTIMENT_ANALYZER_URL": sentiment.url,
+                    "DEALER_DATA_SOURCE": options["data_source"],
+                    "sentiment_cache": SentimentCache(
+                        os.path.join(cache_dir, "sentiment.sqlite3"),
+                    ),
+                }.items():
+                    stack.enter_context(
+                        mock.patch.object(restapis, name, value),
+                    )
+                # One log line per request would drown the report.
+                request_log = logging.getLogger("djangoapp.middleware")
+                stack.callback(request_log.setLevel, request_log.level)
+                request_log.setLevel(logging.WARNING)
+                # Submissions stay queued so the run posts nothing to the
+                # stand-in and updates no review aggregates.
+                stack.enter_context(
+                    mock.patch.object(outbox, "OUTBOX_AUTODRAIN", False),
+                )
+
+                sends = scenarios(dealerships, reviews)
+                self.stdout.write(
+                    f"{'scenario':>12} {'req/s':>9} {'p50 ms':>8} "
+                    f"{'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'max':>4} "
+                    f"{'errors':>7}",
+                )
+                for name in names:
+                    clear_caches()
+                    result = results[name] = run_scenario(
+                        sends[name],
+                        options["requests"],
+                        options["concurrency"],
+                        user=user if name == "add_review" else None,
+                        seed=options["seed"],
+                        before=clear_caches if options["cold"] else None,
+                    )
+                    self.stdout.write(
+                        f"{name:>12} {result['throughput']:>9.1f} "
+                        f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                        f"{result['p99_ms']:>8.1f} "
+                        f"{result['db_queries_mean']:>8.2f} "
+                        f"{result['db_queries_max']:>4} {result['errors']:>7}",
+                    )
+        finally:
+            backend.shutdown()
+            sentiment.shutdown()
+            ReviewSubmission.objects.filter(username=BENCH_USERNAME).delete()
+            if created:
+                user.delete()
+
+        baseline_path = Path(options["baseline"])
+        if options["write_baseline"]:
+            self._write_baseline(baseline_path, run_options, results)
+        else:
+            self._check_baseline(
+                baseline_path,
+                run_options,
+                results,
+                options["tolerance"],
+            )
+
+    def _write_baseline(self, path, run_options, results):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {"options": run_options, "scenarios": results},
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote baseline to {path}."))
+
+    def _check_baseline(self, path, run_options, results, tolerance):
+        if not path.exists():
+            self.stdout.write(f"No baseline at {path}; not compared.")
+            return
+        baseline = json.loads(path.read_text(encoding="utf-8"))
+        if baseline["options"] != run_options:
+            self.stdout.write(
+                f"Baseline was recorded with {baseline['options']}; "
+                "not compared.",
+            )
+            return
+
+        regressions = find_regressions(
+            results,
+            baseline["scenarios"],
+            tolerance,
+        )
+        if regressions:
+            raise CommandError(
+                "Regressions against the baseline:\n  "
+                + "\n  ".join(regressions),
+            )
+        self.stdout.write(
+            self.style.SUCCESS("No regressions against the baseline."),
+        )
@@ -0,0 +1,135 @@
+"""
+Benchmark the get_cars view against growing generated catalogs.
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from djangoapp.catalog import invalidate_catalog
+from djangoapp.models import CarMake, CarModel
+from djangoapp.views import get_cars
+
+
+# On a cache miss get_cars reads the catalog version, then runs one query
+# over makes and one over models.
+MAX_QUERIES = 3
+
+
+class _Rollback(Exception):
+    """
+    Raised to discard the generated rows once a run is measured.
+    """
+
+
+def generate_catalog(makes, models_per_make, seed=0):
+    """
+    Bulk insert makes * models_per_make generated CarModel rows.
+    """
+    rng = random.Random(seed)
+    car_makes = CarMake.objects.bulk_create(
+        CarMake(name=f"Make {i}", description=f"Generated make {i}")
+        for i in range(makes)
+    )
+    types = [choice for choice, _ in CarModel.TYPE_CHOICES]
+    CarModel.objects.bulk_create(
+        (
+            CarModel(
+                make=car_make,
+                name=f"Model {car_make.pk}-{j}",
+                car_type=rng.choice(types),
+                year=rng.randint(2015, 2023),
+                dealer_id=rng.randint(1, 50),
+            )
+            for car_make in car_makes
+            for j in range(models_per_make)
+        ),
+        batch_size=2000,
+    )
+
+
+def measure(path, repeat):
+    """
+    Return (best seconds, query count, response bytes) for GET path.
+
+    The catalog cache is invalidated first, so every run reads and
+    serializes the catalog.
+    """
+    request = RequestFactory().get(path)
+    best = None
+    for _ in range(repeat):
+        invalidate_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            size = len(get_cars(request).content)
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(queries), size
+
+
+class Command(BaseCommand):
+    help = (
+        "Time get_cars on generated catalogs of increasing size and check "
+        "that its query count does not grow. Rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--makes",
+            type=int,
+            nargs="+",
+            default=[10, 100, 1000],
+            help="Catalog sizes to run, as numbers of makes.",
+        )
+        parser.add_argument("--models-per-make", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        paths = {
+            "full": "/djangoapp/get_cars",
+            "filtered": "/djangoapp/get_cars?type=SUV&year_min=2020",
+            "paged": "/djangoapp/get_cars?page=2&page_size=50",
+        }
+        self.stdout.write(
+            f"{'makes':>7} {'models':>8} {'variant':>9} "
+            f"{'ms':>9} {'queries':>8} {'bytes':>10}",
+        )
+        most_queries = 0
+        for makes in options["makes"]:
+            try:
+                with transaction.atomic():
+                    generate_catalog(makes, options["models_per_make"])
+                    for variant, path in paths.items():
+                        elapsed, queries, size = measure(
+                            path,
+                            options["repeat"],
+                        )
+                        most_queries = max(most_queries, queries)
+                        self.stdout.write(
+                            f"{makes:>7} "
+                            f"{makes * options['models_per_make']:>8} "
+                            f"{variant:>9} {elapsed * 1000:>9.1f} "
+                            f"{queries:>8} {size:>10}",
+                        )
+                    raise _Rollback
+            except _Rollback:
+                pass
+            # The rollback undid the version bumps made while measuring;
+            # bump again so nothing cached for the generated rows is reused.
+            invalidate_catalog()
+
+        if most_queries <= MAX_QUERIES:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"At most {MAX_QUERIES} queries at every catalog size.",
+                ),
+            )
+        else:
+            raise CommandError(
+                f"get_cars issued {most_queries} queries; "
+                f"expected at most {MAX_QUERIES}.",
+            )
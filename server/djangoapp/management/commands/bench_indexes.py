@@ -0,0 +1,116 @@
+"""
+Show query plans and timings for the CarModel lookup paths.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from djangoapp.management.commands.bench_get_cars import generate_catalog
+from djangoapp.models import CarMake, CarModel
+
+
+class _Rollback(Exception):
+    """
+    Raised to discard the generated rows (and dropped indexes).
+    """
+
+
+def lookup_queries():
+    """
+    Return {label: queryset} for the filters used by views and the admin.
+    """
+    make = CarMake.objects.order_by("pk").first()
+    return {
+        "dealer + make": CarModel.objects.filter(dealer_id=7, make=make),
+        "dealer": CarModel.objects.filter(dealer_id=7),
+        "make + year range": CarModel.objects.filter(
+            make=make,
+            year__gte=2020,
+        ),
+        "type + year": CarModel.objects.filter(car_type="SUV", year=2021),
+        "admin year filter": CarModel.objects.filter(year=2019),
+    }
+
+
+def explain(queryset, tag):
+    """
+    Return the database's query plan for queryset as one line.
+
+    tag is added as an SQL comment so the plan is not served from a
+    prepared statement cached before the indexes were dropped.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"{connection.ops.explain_query_prefix()} {sql} /* {tag} */",
+            params,
+        )
+        rows = cursor.fetchall()
+    return " | ".join(
+        " ".join(str(column) for column in row) for row in rows
+    )
+
+
+def timed(queryset, repeat):
+    """
+    Return (best seconds, row count) for evaluating queryset.
+    """
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(list(queryset.values_list("pk", flat=True)))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large catalog, print the query plan of each CarModel "
+        "lookup and time it with and without the composite indexes. "
+        "Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--makes", type=int, default=200)
+        parser.add_argument("--models-per-make", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def run_queries(self, title, repeat):
+        """
+        Print the plan and timing of every lookup query.
+        """
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for label, queryset in lookup_queries().items():
+            elapsed, rows = timed(queryset, repeat)
+            plan = explain(queryset, title)
+            self.stdout.write(
+                f"  {label:<18} {elapsed * 1000:>8.2f} ms "
+                f"{rows:>7} rows  {plan}",
+            )
+
+    def handle(self, *args, **options):
+        total = options["makes"] * options["models_per_make"]
+        self.stdout.write(f"Generating {total} CarModel rows...")
+        try:
+            with transaction.atomic():
+                generate_catalog(options["makes"], options["models_per_make"])
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"ANALYZE {CarModel._meta.db_table}",
+                    )
+                self.run_queries("With indexes", options["repeat"])
+
+                with connection.cursor() as cursor:
+                    for index in CarModel._meta.indexes:
+                        cursor.execute(
+                            "DROP INDEX "
+                            f"{connection.ops.quote_name(index.name)}",
+                        )
+                self.run_queries("Without indexes", options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
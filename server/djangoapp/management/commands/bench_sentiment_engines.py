@@ -0,0 +1,209 @@
+"""
+Compare the remote and local sentiment engines on the review corpus.
+"""
+
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp import restapis
+from djangoapp.loadtest import DATA_DIR, percentile
+from djangoapp.microservices.sentiment_cache import (
+    SentimentCache,
+    load_review_texts,
+)
+
+SERVICE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "microservices",
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Sentiment service did not start on port {port}")
+
+
+def start_service():
+    """
+    Start the sentiment service under gunicorn with one worker and its
+    result cache off; return (process, url).
+    """
+    port = _free_port()
+    env = dict(
+        os.environ,
+        WORKERS="1",
+        BIND=f"127.0.0.1:{port}",
+        SENTIMENT_CACHE="off",
+        LOG_LEVEL="warning",
+    )
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=SERVICE_DIR,
+        env=env,
+    )
+    try:
+        _wait_until_ready(port)
+    except CommandError:
+        process.terminate()
+        raise
+    return process, f"http://127.0.0.1:{port}"
+
+
+@contextmanager
+def empty_sentiment_cache():
+    """
+    Swap restapis' sentiment cache for an empty temporary one.
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = SentimentCache(os.path.join(cache_dir, "cache.sqlite3"))
+        with mock.patch.object(restapis, "sentiment_cache", cache):
+            yield
+
+
+def time_calls(calls):
+    """
+    Run each call and return (per-call seconds, total seconds).
+    """
+    latencies = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    return latencies, sum(latencies)
+
+
+class Command(BaseCommand):
+    help = (
+        "Score the reviews.json corpus with the remote (HTTP) and local "
+        "(in-process VADER) sentiment engines, one text per call and in "
+        "batches, report latency and docs/sec, and check that both "
+        "engines return the same labels."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sentiment-url",
+            help="Running sentiment service to use (default: start one).",
+        )
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Passes over the corpus per engine and mode.",
+        )
+
+    def run_engine(self, engine, texts, options):
+        """
+        Time single and batch scoring with engine; return the labels.
+
+        Every pass starts from an empty sentiment cache, so the remote
+        engine sends every text to the service.
+        """
+        size = options["batch_size"]
+        batches = [
+            texts[start:start + size]
+            for start in range(0, len(texts), size)
+        ]
+        modes = {
+            "single": [
+                lambda text=text: restapis.analyze_review_sentiments(text)
+                for text in texts
+            ],
+            "batch": [
+                lambda batch=batch: (
+                    restapis.analyze_review_sentiments_batch(batch)
+                )
+                for batch in batches
+            ],
+        }
+        with mock.patch.object(restapis, "SENTIMENT_ENGINE", engine):
+            for mode, calls in modes.items():
+                latencies, total = [], 0.0
+                for _ in range(options["repeat"]):
+                    with empty_sentiment_cache():
+                        pass_latencies, pass_total = time_calls(calls)
+                    latencies.extend(pass_latencies)
+                    total += pass_total
+                latencies.sort()
+                docs = len(texts) * options["repeat"]
+                self.stdout.write(
+                    f"{engine:>7} {mode:>7} {len(latencies):>7} "
+                    f"{percentile(latencies, 0.50) * 1000:>9.3f} "
+                    f"{percentile(latencies, 0.95) * 1000:>9.3f} "
+                    f"{docs / total:>10.1f}",
+                )
+            with empty_sentiment_cache():
+                results = restapis.analyze_review_sentiments_batch(texts)
+        return [result.get("sentiment") for result in results]
+
+    def handle(self, *args, **options):
+        texts = load_review_texts(os.path.join(DATA_DIR, "reviews.json"))
+        process, url = None, options["sentiment_url"]
+        if url is None:
+            process, url = start_service()
+        # Load the lexicon up front so it is not timed as a call.
+        restapis.local_analyzer.get()
+
+        self.stdout.write(
+            f"{len(texts)} reviews, batch size {options['batch_size']}, "
+            f"{options['repeat']} passes",
+        )
+        self.stdout.write(
+            f"{'engine':>7} {'mode':>7} {'calls':>7} {'p50 ms':>9} "
+            f"{'p95 ms':>9} {'docs/s':>10}",
+        )
+        try:
+            with mock.patch.object(restapis, "SENTIMENT_ANALYZER_URL", url):
+                labels = {
+                    engine: self.run_engine(engine, texts, options)
+                    for engine in ("remote", "local")
+                }
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+        mismatches = [
+            text
+            for text, remote, local in zip(
+                texts,
+                labels["remote"],
+                labels["local"],
+            )
+            if remote != local
+        ]
+        if mismatches:
+            raise CommandError(
+                f"The engines disagree on {len(mismatches)} reviews, "
+                f"e.g. {mismatches[0]!r}.",
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Both engines gave the same label for all {len(texts)} "
+                "reviews.",
+            ),
+        )
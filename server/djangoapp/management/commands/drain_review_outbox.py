@@ -0,0 +1,45 @@
+"""
+Post queued review submissions to the backend.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from djangoapp.outbox import OUTBOX_BATCH_SIZE, drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver due reviews from the outbox to the backend in batches, "
+        "rescheduling failed deliveries with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help="Submissions claimed per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            type=float,
+            default=0,
+            help="Keep polling every N seconds instead of exiting.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = drain(options["batch_size"])
+            if any(counts.values()) or not options["loop"]:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Sent {counts['sent']} reviews, "
+                        f"{counts['retrying']} rescheduled, "
+                        f"{counts['failed']} failed.",
+                    ),
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
@@ -0,0 +1,48 @@
+"""
+Bulk import car inventory records into CarMake and CarModel.
+"""
+
+from django.core.management.base import BaseCommand
+
+from djangoapp.importer import (
+    DEFAULT_BATCH_SIZE,
+    CarImporter,
+    rows_per_second,
+)
+from djangoapp.populate import DEFAULT_CAR_RECORDS_PATH
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a car_records.json-shaped file into CarMake/CarModel with "
+        "batched bulk inserts. Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=str(DEFAULT_CAR_RECORDS_PATH),
+            help="File to import (defaults to database/data/car_records.json).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Records inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        importer = CarImporter(batch_size=options["batch_size"])
+        stats = importer.import_path(options["path"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {stats['records']} records in "
+                f"{stats['seconds']:.2f}s "
+                f"({rows_per_second(stats):,.0f} rows/sec): "
+                f"{stats['makes_created']} makes and "
+                f"{stats['models_created']} models created, "
+                f"{stats['duplicates']} already present, "
+                f"{stats['skipped']} invalid records skipped.",
+            ),
+        )
@@ -0,0 +1,52 @@
+"""
+Recompute every dealer's review aggregates from the backend's reviews.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp.restapis import (
+    analyze_review_sentiments_batch,
+    get_request,
+    unscored_texts,
+    with_sentiments,
+)
+from djangoapp.reviewstats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-dealer review aggregates (counts, sentiment mix, "
+        "purchase rate) from every review in the backend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Reviews scored per sentiment service call. Reviews "
+            "stored with a sentiment label are not rescored.",
+        )
+
+    def handle(self, *args, **options):
+        reviews = get_request("/fetchReviews")
+        if reviews is None:
+            raise CommandError("Could not fetch reviews from the backend.")
+
+        sentiments = []
+        size = options["batch_size"]
+        for start in range(0, len(reviews), size):
+            batch = reviews[start:start + size]
+            results = analyze_review_sentiments_batch(unscored_texts(batch))
+            sentiments.extend(
+                review["sentiment"]
+                for review in with_sentiments(batch, results)
+            )
+
+        dealers = rebuild_stats(reviews, sentiments)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt review stats for {dealers} dealers "
+                f"from {len(reviews)} reviews.",
+            ),
+        )
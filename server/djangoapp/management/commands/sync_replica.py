@@ -0,0 +1,78 @@
+"""
+Copy dealerships and new reviews from the backend into the local replica.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp import replica
+from djangoapp.restapis import get_request
+
+
+class Command(BaseCommand):
+    help = (
+        "Sync the local Dealership/Review replica from the backend. Dealers "
+        "are copied in full; reviews incrementally after the last synced "
+        "review id."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=1000,
+            help="Reviews fetched per backend request.",
+        )
+        parser.add_argument(
+            "--loop",
+            type=float,
+            default=0,
+            help="Keep syncing every N seconds instead of exiting.",
+        )
+
+    def sync_dealers(self):
+        result = get_request("/fetchDealers")
+        if result is None:
+            raise CommandError("Could not fetch dealers from the backend.")
+        if isinstance(result, dict):
+            result = result.get("dealers", [])
+        return replica.upsert_dealers(result)
+
+    def sync_reviews(self, page_size):
+        synced = 0
+        while True:
+            after = replica.review_sync_cursor()
+            page = get_request("/fetchReviews", after=after, limit=page_size)
+            if page is None:
+                raise CommandError("Could not fetch reviews from the backend.")
+            synced += replica.upsert_reviews(page)
+            ids = [record["id"] for record in page if record.get("id")]
+            last = max(ids, default=after)
+            if last > after:
+                replica.advance_review_sync_cursor(last)
+            # Stop on a short page, or if the backend ignored "after".
+            if len(page) < page_size or last <= after:
+                return synced
+
+    def sync(self, page_size):
+        dealers = self.sync_dealers()
+        reviews = self.sync_reviews(page_size)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Synced {dealers} dealers and {reviews} new reviews.",
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if not options["loop"]:
+            self.sync(options["page_size"])
+            return
+        while True:
+            # A failed sync (e.g. the backend briefly unreachable) is
+            # retried at the next interval rather than ending the loop.
+            try:
+                self.sync(options["page_size"])
+            except CommandError as exc:
+                self.stderr.write(self.style.ERROR(f"Sync failed: {exc}"))
+            time.sleep(options["loop"])
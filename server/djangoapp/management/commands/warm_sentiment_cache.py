@@ -0,0 +1,49 @@
+"""
+Pre-warm the sentiment cache from a reviews.json-shaped file.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from djangoapp.microservices.sentiment_cache import load_review_texts
+from djangoapp.restapis import analyze_review_sentiments_batch
+
+DEFAULT_REVIEWS_PATH = (
+    Path(settings.BASE_DIR) / "database" / "data" / "reviews.json"
+)
+
+
+class Command(BaseCommand):
+    help = "Score every review in a reviews.json file into the sentiment cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=str(DEFAULT_REVIEWS_PATH),
+            help="reviews.json-shaped file to read review texts from.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Texts sent to the sentiment service per request.",
+        )
+
+    def handle(self, *args, **options):
+        texts = load_review_texts(options["path"])
+        batch_size = options["batch_size"]
+        failed = 0
+        for start in range(0, len(texts), batch_size):
+            results = analyze_review_sentiments_batch(
+                texts[start:start + batch_size],
+            )
+            failed += sum(1 for r in results if r.get("sentiment") == "N/A")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed sentiment cache with {len(texts) - failed} of "
+                f"{len(texts)} reviews.",
+            ),
+        )
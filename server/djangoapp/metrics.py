@@ -0,0 +1,173 @@
+"""
+In-process metrics exported in the Prometheus text exposition format.
+
+Request latency, per-request database query counts and upstream call
+durations are recorded into the histograms below by
+request_metrics_middleware (middleware.py) and the pooled HTTP clients
+(httpclient.py). Cache, circuit breaker and connection pool
+figures are read from their own counters when /metrics is scraped, via
+collectors registered with register_collector().
+
+Metrics are kept per process: with several workers, scrape each one (or
+aggregate in Prometheus by instance).
+"""
+
+import math
+import threading
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    """
+    Escape a label value for the text exposition format.
+    """
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _labels(names, values, extra=()):
+    """
+    Return the {name="value",...} label set of a sample, or "".
+    """
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    inner = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + inner + "}"
+
+
+def _number(value):
+    """
+    Format a sample value.
+    """
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """
+    Cumulative histogram with labels and fixed bucket bounds.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        buckets=LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        """
+        Record one observation for labelvalues.
+        """
+        with self._lock:
+            counts, total = self._values.get(
+                labelvalues,
+                ([0] * len(self.buckets), 0.0),
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[labelvalues] = (counts, total + value)
+
+    def samples(self):
+        """
+        Yield the cumulative bucket, sum and count samples per label set.
+        """
+        with self._lock:
+            values = {key: (list(c), s) for key, (c, s) in self._values.items()}
+        for labelvalues, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _labels(
+                    self.labelnames,
+                    labelvalues,
+                    [("le", _number(bound))],
+                )
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = _labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+REQUEST_DURATION = Histogram(
+    "django_request_duration_seconds",
+    "Time spent handling a request, by view.",
+    ("view", "method", "status"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "django_request_db_queries",
+    "Database queries run while handling a request, by view.",
+    ("view",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds",
+    "Duration of calls to upstream services, by endpoint and status.",
+    ("upstream", "endpoint", "method", "status"),
+)
+
+_metrics = [REQUEST_DURATION, REQUEST_DB_QUERIES, UPSTREAM_DURATION]
+_collectors = []
+
+
+def register_collector(collector):
+    """
+    Register a callable returning (name, kind, help, samples) families,
+    where samples is a list of ({label: value}, value) pairs. It is called
+    on every scrape.
+    """
+    _collectors.append(collector)
+
+
+def render():
+    """
+    Return every metric in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {_number(value)}")
+
+    for collector in _collectors:
+        for name, kind, documentation, samples in collector():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_string = _labels(labels.keys(), labels.values())
+                lines.append(f"{name}{label_string} {_number(value)}")
+    return "\n".join(lines) + "\n"
@@ -1,35 +1,179 @@
-from flask import Flask
-from nltk.sentiment import SentimentIntensityAnalyzer
+from flask import Flask, g, jsonify, request
+import cProfile
+import io
 import json
+import logging
+import os
+import pstats
+import threading
+import time
+from bulk_scoring import BulkScorer
+from scoring import load_analyzer, score
+from sentiment_cache import SentimentCache, load_review_texts
 app = Flask("Sentiment Analyzer")
 
-sia = SentimentIntensityAnalyzer()
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger("sentiment")
+
+# Use the bundled sentiment/vader_lexicon.zip. The analyzer is built once at
+# import time; under gunicorn with preload_app it is shared by all workers.
+sia = load_analyzer(HERE)
+
+# Batches of at least this many unseen texts are scored with the vectorized
+# BulkScorer (same scores, less time per text); smaller ones one at a time.
+# BULK_SCORING=off always scores one text at a time.
+BULK_MIN_BATCH = int(os.getenv("BULK_MIN_BATCH", "16"))
+bulk = None
+if os.getenv("BULK_SCORING", "on").lower() != "off":
+    bulk = BulkScorer(sia)
+
+# Largest number of texts accepted by /analyze/batch in one request
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
+# Scores are cached on disk by review text hash and survive restarts.
+# SENTIMENT_CACHE=off disables the cache (e.g. for benchmarking the scorer).
+cache = None
+if os.getenv("SENTIMENT_CACHE", "on").lower() != "off":
+    cache = SentimentCache(
+        os.getenv("SENTIMENT_CACHE_PATH",
+                  os.path.join(HERE, "sentiment_cache.sqlite3")),
+        int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", "200000")),
+    )
+# Reviews scored into the cache at startup
+WARM_REVIEWS_PATH = os.getenv(
+    "WARM_REVIEWS_PATH",
+    os.path.join(HERE, "..", "..", "database", "data", "reviews.json"),
+)
+
+# Per-request profiling with cProfile. PROFILE=header profiles requests
+# sent with an "X-Profile: 1" header, PROFILE=all profiles every request;
+# off by default. The PROFILE_TOP slowest functions (by cumulative time)
+# are logged, and the full profile is written to PROFILE_DIR if set, for
+# loading into pstats or snakeviz.
+PROFILE = os.getenv("PROFILE", "off").lower()
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "20"))
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+# Only one cProfile profiler can be active per process at a time.
+_profiling = threading.Lock()
+
+
+def score_texts(texts):
+    """Return {"sentiment", "scores"} results for texts, in order.
+
+    Cached results are reused; only unseen texts are scored and stored.
+    """
+    results = cache.get_many(texts) if cache else {}
+    unseen = list(dict.fromkeys(text for text in texts if text not in results))
+    if bulk and len(unseen) >= BULK_MIN_BATCH:
+        missing = dict(zip(unseen, bulk.score(unseen)))
+    else:
+        missing = {text: score(sia, text) for text in unseen}
+    if cache:
+        cache.put_many(missing)
+    results.update(missing)
+    return [results[text] for text in texts]
+
+
+def warm_cache(path=WARM_REVIEWS_PATH):
+    """Score every review in a reviews.json file into the cache."""
+    if not cache:
+        return
+    if not os.path.exists(path):
+        logger.info("No reviews to pre-warm the sentiment cache from at %s",
+                    path)
+        return
+    texts = load_review_texts(path)
+    score_texts(texts)
+    logger.info("Sentiment cache warmed with %d reviews", len(texts))
+
+
+warm_cache()
+
+
+def _wants_profile():
+    if PROFILE == "all":
+        return True
+    return PROFILE == "header" and request.headers.get("X-Profile") == "1"
+
+
+@app.before_request
+def start_profile():
+    if _wants_profile() and _profiling.acquire(blocking=False):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+@app.after_request
+def dump_profile(response):
+    """Log the hot spots of a profiled request and save its profile."""
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    _profiling.release()
+
+    # The rule, not the path: GET paths carry the review text.
+    endpoint = request.url_rule.rule if request.url_rule else request.path
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+    logger.info("Profile of %s %s:\n%s", request.method, endpoint,
+                out.getvalue())
+    if PROFILE_DIR:
+        name = (f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+                f"{request.endpoint or 'unmatched'}.prof")
+        profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+        response.headers["X-Profile-File"] = name
+    return response
 
 
 @app.get('/')
 def home():
     return "Welcome to the Sentiment Analyzer. \
-    Use /analyze/text to get the sentiment"
+    Use /analyze/text to get the sentiment, \
+    or POST a JSON list of texts to /analyze/batch"
 
 
 @app.get('/analyze/<input_txt>')
 def analyze_sentiment(input_txt):
 
-    scores = sia.polarity_scores(input_txt)
-    print(scores)
-    pos = float(scores['pos'])
-    neg = float(scores['neg'])
-    neu = float(scores['neu'])
-    res = "positive"
-    print("pos neg nue ", pos, neg, neu)
-    if (neg > pos and neg > neu):
-        res = "negative"
-    elif (neu > neg and neu > pos):
-        res = "neutral"
-    res = json.dumps({"sentiment": res})
-    print(res)
-    return res
+    result = score_texts([input_txt])[0]
+    logger.debug("Scores %s -> %s", result["scores"], result["sentiment"])
+    return json.dumps({"sentiment": result["sentiment"]})
+
+
+@app.post('/analyze/batch')
+def analyze_sentiment_batch():
+    """Score a JSON list of texts (or {"texts": [...]}) in one request.
+
+    Results are returned in input order. Large batches are scored with the
+    vectorized BulkScorer.
+    """
+    payload = request.get_json(silent=True)
+    texts = payload.get("texts") if isinstance(payload, dict) else payload
+    if not isinstance(texts, list) or not all(
+            isinstance(text, str) for text in texts):
+        return jsonify({"error": "Expected a JSON list of strings"}), 400
+    if len(texts) > MAX_BATCH_SIZE:
+        return jsonify(
+            {"error": f"At most {MAX_BATCH_SIZE} texts per batch"}), 413
+
+    return jsonify({"results": score_texts(texts)})
+
+
+@app.get('/cache/stats')
+def cache_stats():
+    if not cache:
+        return jsonify({"enabled": False})
+    return jsonify(cache.stats())
 
 
 if __name__ == "__main__":
+    # Development server only; production runs under gunicorn, see
+    # gunicorn.conf.py.
     app.run(debug=True)
@@ -0,0 +1,151 @@
+"""Latency microbenchmark for the sentiment scorer by text length.
+
+Scores the reviews.json corpus and synthetic texts of increasing length
+(random words drawn from the corpus) one text per call, first in-process
+through score_texts (the VADER path behind analyze_sentiment) and then
+over HTTP against the service under gunicorn with a single worker. Reports
+per-call latency percentiles and docs/sec for each text set. The result
+cache is disabled so every text is scored.
+
+    python bench_scorer.py --lengths 100 1000 5000 --samples 50
+
+Hot spots of individual requests can be inspected with the service's
+profiling mode (PROFILE=header and an "X-Profile: 1" request header).
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+from bench_throughput import REVIEWS_PATH, free_port, wait_until_ready
+from sentiment_cache import load_review_texts
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Longest GET request line gunicorn accepts; longer texts are POSTed to
+# /analyze/batch instead.
+MAX_REQUEST_LINE = 4094
+
+
+def synthetic_texts(corpus, words, samples, seed=0):
+    """Return samples texts of words random words from the corpus."""
+    rng = random.Random(seed)
+    vocabulary = sorted({word for text in corpus for word in text.split()})
+    return [" ".join(rng.choices(vocabulary, k=words))
+            for _ in range(samples)]
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(math.ceil(fraction * len(ordered)), 1) - 1]
+
+
+def summarize(latencies):
+    """Return (p50, p95, p99) in ms and docs/sec for per-call latencies."""
+    ordered = sorted(latencies)
+    return ([percentile(ordered, q) * 1000 for q in (0.50, 0.95, 0.99)],
+            len(ordered) / sum(ordered))
+
+
+def time_direct(texts, repeat):
+    """Per-call latencies of scoring each text in-process."""
+    os.environ["SENTIMENT_CACHE"] = "off"
+    # Imported here so the cache setting above applies to the app module.
+    from app import score_texts  # pylint: disable=import-outside-toplevel
+
+    latencies = []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            score_texts([text])
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def send(conn, text):
+    """Score one text over HTTP, by GET when the URL fits, else by POST."""
+    path = "/analyze/" + quote(text, safe="")
+    if len(path) + len("GET  HTTP/1.1") <= MAX_REQUEST_LINE:
+        conn.request("GET", path)
+    else:
+        conn.request("POST", "/analyze/batch", json.dumps([text]),
+                     {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"Service returned {response.status}")
+
+
+def time_http(port, texts, repeat):
+    """Per-call latencies of scoring each text through the service."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    latencies = []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            send(conn, text)
+            latencies.append(time.perf_counter() - started)
+    conn.close()
+    return latencies
+
+
+def start_service():
+    """Start the service under gunicorn with one worker; return it, port."""
+    port = free_port()
+    env = dict(os.environ, WORKERS="1", BIND=f"127.0.0.1:{port}",
+               SENTIMENT_CACHE="off", LOG_LEVEL="warning")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "app:app"],
+        cwd=HERE, env=env)
+    wait_until_ready(port)
+    return server, port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+",
+                        default=[100, 1000, 5000],
+                        help="Word counts of the synthetic texts.")
+    parser.add_argument("--samples", type=int, default=50,
+                        help="Synthetic texts per length.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Times each text set is scored.")
+    parser.add_argument("--no-http", action="store_true",
+                        help="Only score in-process.")
+    args = parser.parse_args()
+
+    corpus = load_review_texts(REVIEWS_PATH)
+    text_sets = {"corpus": corpus}
+    for words in sorted(set(args.lengths)):
+        text_sets[f"{words} words"] = synthetic_texts(corpus, words,
+                                                      args.samples)
+
+    modes = {"direct": lambda texts: time_direct(texts, args.repeat)}
+    server = None
+    if not args.no_http:
+        server, port = start_service()
+        modes["http"] = lambda texts: time_http(port, texts, args.repeat)
+
+    print(f"{'texts':>12} {'mode':>7} {'calls':>7} {'p50 ms':>9} "
+          f"{'p95 ms':>9} {'p99 ms':>9} {'docs/s':>9}")
+    try:
+        for name, texts in text_sets.items():
+            for mode, timer in modes.items():
+                latencies = timer(texts)
+                (p50, p95, p99), rate = summarize(latencies)
+                print(f"{name:>12} {mode:>7} {len(latencies):>7} "
+                      f"{p50:>9.3f} {p95:>9.3f} {p99:>9.3f} {rate:>9.1f}")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
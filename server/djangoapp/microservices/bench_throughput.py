@@ -0,0 +1,115 @@
+"""Throughput benchmark for the sentiment service across worker counts.
+
+Starts the service under gunicorn (see gunicorn.conf.py) with 1, 2, 4, ...
+pre-forked workers, drives POST /analyze/batch from several client
+processes for a fixed duration and reports requests/sec and texts/sec
+per worker count. The result cache is disabled so every text is scored.
+
+    python bench_throughput.py --workers 1 2 4 8 --clients 16 --duration 10
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from sentiment_cache import load_review_texts
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REVIEWS_PATH = os.path.join(HERE, "..", "..", "database", "data",
+                            "reviews.json")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Service did not start on port {port}")
+
+
+def client_loop(args):
+    """Send batches until the deadline; return (requests, texts) sent."""
+    port, deadline, corpus, batch_size, seed = args
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    requests_sent = 0
+    while time.time() < deadline:
+        body = json.dumps(rng.sample(corpus, batch_size))
+        conn.request("POST", "/analyze/batch", body,
+                     {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"Service returned {response.status}")
+        requests_sent += 1
+    conn.close()
+    return requests_sent, requests_sent * batch_size
+
+
+def run(workers, clients, duration, batch_size, corpus):
+    port = free_port()
+    env = dict(os.environ, WORKERS=str(workers), BIND=f"127.0.0.1:{port}",
+               SENTIMENT_CACHE="off", LOG_LEVEL="warning")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "app:app"],
+        cwd=HERE, env=env)
+    try:
+        wait_until_ready(port)
+        deadline = time.time() + duration
+        jobs = [(port, deadline, corpus, batch_size, seed)
+                for seed in range(clients)]
+        started = time.time()
+        with multiprocessing.Pool(clients) as pool:
+            totals = pool.map(client_loop, jobs)
+        elapsed = time.time() - started
+    finally:
+        server.terminate()
+        server.wait()
+    sent = sum(t[0] for t in totals)
+    texts = sum(t[1] for t in totals)
+    return sent / elapsed, texts / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[1, 2, 4, multiprocessing.cpu_count()])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = load_review_texts(REVIEWS_PATH)
+    batch_size = min(args.batch_size, len(corpus))
+    print(f"{multiprocessing.cpu_count()} CPUs, {args.clients} clients, "
+          f"batch size {batch_size}, {args.duration}s per run")
+    print(f"{'workers':>8} {'req/s':>10} {'texts/s':>10} {'scaling':>8}")
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        req_rate, text_rate = run(workers, args.clients, args.duration,
+                                  batch_size, corpus)
+        baseline = baseline or req_rate
+        print(f"{workers:>8} {req_rate:>10.1f} {text_rate:>10.1f} "
+              f"{req_rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Vectorized VADER scoring for large batches of texts.
+
+BulkScorer gives the same scores as SentimentIntensityAnalyzer's
+polarity_scores, but it scores a whole batch at once:
+
+- Each text is tokenized as VADER does.
+- Every distinct token is looked up once, into arrays of lexicon valence
+  and rule flags (booster, negation, caps and so on).
+- The valence rules are applied to all tokens of the batch together with
+  NumPy: caps emphasis, the three-word booster and negation window,
+  "least", "but" and booster skipping.
+- The pos/neg/neu/compound sums are taken per text with bincount.
+
+Texts that could hit one of VADER's multi-word idioms ("cut the mustard",
+"kind of", ...) are rare. They, and non-string input, are scored one at a
+time with polarity_scores instead, so every result stays exact.
+
+As a CLI it scores a reviews.json file and can check every score against
+polarity_scores:
+
+    python bulk_scoring.py ../../database/data/reviews.json --validate
+"""
+import argparse
+import json
+import math
+import string
+import sys
+import time
+
+import numpy as np
+from nltk.sentiment.vader import VaderConstants
+
+from scoring import load_analyzer, sentiment_label
+from sentiment_cache import load_review_texts
+
+C = VaderConstants()
+_PUNCTUATION = set(string.punctuation)
+_PUNC_LIST = set(C.PUNC_LIST)
+# Multi-word phrases checked by VADER's idiom rule; texts containing one
+# fall back to polarity_scores.
+_PHRASES = [*C.SPECIAL_CASE_IDIOMS,
+            *(key for key in C.BOOSTER_DICT if " " in key)]
+
+# Columns of the per-token property table
+(IN_LEX, LEX, IS_BOOSTER, BOOSTER, NEGATED, UPPER, NEVER, SO_THIS, LEAST,
+ AT_VERY, BUT, KIND, OF) = range(13)
+
+
+def tokenize(text):
+    """Return VADER's words_and_emoticons for text.
+
+    Same result as SentiText, without building its punctuation product
+    dictionary: a token is stripped of a PUNC_LIST prefix or suffix when
+    the rest is a word of the punctuation-free text.
+    """
+    words = {word for word in C.REGEX_REMOVE_PUNCTUATION.sub("", text).split()
+             if len(word) > 1}
+    tokens = []
+    for token in text.split():
+        if len(token) <= 1:
+            continue
+        if token[0] in _PUNCTUATION or token[-1] in _PUNCTUATION:
+            lead = len(token) - len(token.lstrip(string.punctuation))
+            trail = len(token) - len(token.rstrip(string.punctuation))
+            if lead and token[:lead] in _PUNC_LIST and token[lead:] in words:
+                token = token[lead:]
+            elif (trail and token[-trail:] in _PUNC_LIST
+                  and token[:-trail] in words):
+                token = token[:-trail]
+        tokens.append(token)
+    return tokens
+
+
+def punctuation_amplifier(text):
+    """VADER's emphasis from exclamation and question marks."""
+    ep_amplifier = min(text.count("!"), 4) * 0.292
+    qm_count = text.count("?")
+    qm_amplifier = 0
+    if qm_count > 1:
+        qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+    return ep_amplifier + qm_amplifier
+
+
+def _cap_differential(tokens):
+    uppers = sum(token.isupper() for token in tokens)
+    return 0 < len(tokens) - uppers < len(tokens)
+
+
+class BulkScorer:
+    """Scores batches of texts like analyzer.polarity_scores."""
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.lexicon = analyzer.lexicon
+
+    def _properties(self, token):
+        lower = token.lower()
+        valence = self.lexicon.get(lower)
+        booster = C.BOOSTER_DICT.get(lower)
+        return (
+            valence is not None,
+            valence or 0.0,
+            booster is not None,
+            booster or 0.0,
+            lower in C.NEGATE or "n't" in lower,
+            token.isupper(),
+            token == "never",
+            token in ("so", "this"),
+            lower == "least",
+            lower in ("at", "very"),
+            lower == "but",
+            lower == "kind",
+            lower == "of",
+        )
+
+    @staticmethod
+    def _needs_exact(text, tokens):
+        if not isinstance(text, str):
+            return True
+        joined = f" {' '.join(tokens)} "
+        return any(f" {phrase} " in joined for phrase in _PHRASES)
+
+    def polarity_scores(self, texts):
+        """Return VADER's neg/neu/pos/compound scores for each text."""
+        results = [None] * len(texts)
+        token_ids = {}
+        flat_ids, first, local, text_of = [], [], [], []
+        batch = []
+        for index, text in enumerate(texts):
+            tokens = tokenize(text) if isinstance(text, str) else []
+            if self._needs_exact(text, tokens):
+                results[index] = self.analyzer.polarity_scores(text)
+                continue
+            start = len(flat_ids)
+            seen = {}
+            for position, token in enumerate(tokens):
+                flat_ids.append(token_ids.setdefault(token, len(token_ids)))
+                first.append(start + seen.setdefault(token, position))
+                local.append(position)
+                text_of.append(len(batch))
+            batch.append((index, text, len(tokens), _cap_differential(tokens)))
+        if batch:
+            self._score_batch(results, batch, token_ids, flat_ids, first,
+                              local, text_of)
+        return results
+
+    def _score_batch(self, results, batch, token_ids, flat_ids, first, local,
+                     text_of):
+        table = np.array([self._properties(token) for token in token_ids],
+                         dtype=float).reshape(-1, 13)
+        ids = np.array(flat_ids, dtype=np.intp)
+        props = table[ids].T
+        flags = props.astype(bool)
+        lex, booster = props[LEX], props[BOOSTER]
+        in_lex, upper, neg = flags[IN_LEX], flags[UPPER], flags[NEGATED]
+        j = np.arange(len(ids))
+        li = np.array(local, dtype=np.intp)
+        text_index = np.array(text_of, dtype=np.intp)
+        lengths = np.array([item[2] for item in batch], dtype=np.intp)
+        cap = np.array([item[3] for item in batch], dtype=bool)[text_index]
+
+        def before(column, k):
+            # Property of the token k places earlier in the same text; the
+            # result is only used where li >= k.
+            return column[np.maximum(j - k, 0)]
+
+        valence = np.where(in_lex, lex, 0.0)
+        valence = np.where(in_lex & upper & cap,
+                           np.where(valence > 0, valence + C.C_INCR,
+                                    valence - C.C_INCR),
+                           valence)
+        for k in range(3):
+            apply = in_lex & (li > k) & ~before(in_lex, k + 1)
+            is_booster = before(flags[IS_BOOSTER], k + 1)
+            scalar = np.where(is_booster, before(booster, k + 1), 0.0)
+            scalar = np.where(valence < 0, scalar * -1, scalar)
+            scalar = np.where(
+                is_booster & before(upper, k + 1) & cap,
+                np.where(valence > 0, scalar + C.C_INCR, scalar - C.C_INCR),
+                scalar)
+            if k == 1:
+                scalar = scalar * 0.95
+            elif k == 2:
+                scalar = scalar * 0.9
+            valence = np.where(apply, valence + scalar, valence)
+
+            # _never_check
+            if k == 0:
+                valence = np.where(apply & before(neg, 1),
+                                   valence * C.N_SCALAR, valence)
+            else:
+                emphasis = 1.5 if k == 1 else 1.25
+                never_so = (before(flags[NEVER], k + 1)
+                            & before(flags[SO_THIS], k))
+                if k == 2:
+                    never_so |= before(flags[SO_THIS], 1)
+                valence = np.where(
+                    apply & never_so, valence * emphasis,
+                    np.where(apply & before(neg, k + 1),
+                             valence * C.N_SCALAR, valence))
+
+        # _least_check
+        least = in_lex & (li > 0) & ~before(in_lex, 1) & before(flags[LEAST], 1)
+        least &= ((li > 1) & ~before(flags[AT_VERY], 2)) | (li == 1)
+        valence = np.where(least, valence * C.N_SCALAR, valence)
+
+        # Boosters and "kind" in "kind of" score 0.
+        following_of = flags[OF][np.minimum(j + 1, len(ids) - 1)]
+        kind_of = flags[KIND] & (li < lengths[text_index] - 1) & following_of
+        valence = np.where(flags[IS_BOOSTER] | kind_of, 0.0, valence)
+
+        # Every occurrence of a token takes the valence computed at its
+        # first occurrence, as polarity_scores does.
+        sentiments = valence[np.array(first, dtype=np.intp)]
+
+        # _but_check
+        but_at = np.full(len(batch), -1, dtype=np.intp)
+        buts = np.flatnonzero(flags[BUT])
+        if len(buts):
+            texts_with_but, firsts = np.unique(text_index[buts],
+                                               return_index=True)
+            but_at[texts_with_but] = li[buts[firsts]]
+        bi = but_at[text_index]
+        sentiments = np.where((bi >= 0) & (li < bi), sentiments * 0.5,
+                              np.where((bi >= 0) & (li > bi),
+                                       sentiments * 1.5, sentiments))
+
+        count = len(batch)
+        sums = np.bincount(text_index, sentiments, count).tolist()
+        pos_sums = np.bincount(
+            text_index, np.where(sentiments > 0, sentiments + 1, 0.0),
+            count).tolist()
+        neg_sums = np.bincount(
+            text_index, np.where(sentiments < 0, sentiments - 1, 0.0),
+            count).tolist()
+        neu_counts = np.bincount(text_index, sentiments == 0, count).tolist()
+
+        for row, (index, text, length, _) in enumerate(batch):
+            results[index] = _score_valence(
+                length, sums[row], pos_sums[row], neg_sums[row],
+                int(neu_counts[row]), text)
+
+    def score(self, texts):
+        """Return {"sentiment", "scores"} results for texts, in order."""
+        return [{"sentiment": sentiment_label(scores), "scores": scores}
+                for scores in self.polarity_scores(texts)]
+
+
+def _score_valence(length, sum_s, pos_sum, neg_sum, neu_count, text):
+    """VADER's score_valence from a text's per-token sums."""
+    if not length:
+        return {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+    amplifier = punctuation_amplifier(text)
+    if sum_s > 0:
+        sum_s += amplifier
+    elif sum_s < 0:
+        sum_s -= amplifier
+    compound = C.normalize(sum_s)
+    if pos_sum > math.fabs(neg_sum):
+        pos_sum += amplifier
+    elif pos_sum < math.fabs(neg_sum):
+        neg_sum -= amplifier
+    total = pos_sum + math.fabs(neg_sum) + neu_count
+    return {
+        "neg": round(math.fabs(neg_sum / total), 3),
+        "neu": round(math.fabs(neu_count / total), 3),
+        "pos": round(math.fabs(pos_sum / total), 3),
+        "compound": round(compound, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("reviews", help="reviews.json-shaped file to score")
+    parser.add_argument("--output", help="Write results here as JSON "
+                        "(default: stdout, unless --validate)")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--validate", action="store_true",
+                        help="Check every score against polarity_scores")
+    args = parser.parse_args()
+
+    texts = load_review_texts(args.reviews)
+    analyzer = load_analyzer()
+    scorer = BulkScorer(analyzer)
+
+    started = time.perf_counter()
+    results = []
+    for start in range(0, len(texts), args.batch_size):
+        results.extend(scorer.score(texts[start:start + args.batch_size]))
+    elapsed = time.perf_counter() - started
+    print(f"Scored {len(texts)} texts in {elapsed:.3f}s "
+          f"({len(texts) / elapsed:.0f} docs/s)", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle)
+    elif not args.validate:
+        json.dump(results, sys.stdout)
+        print()
+
+    if args.validate:
+        started = time.perf_counter()
+        expected = [analyzer.polarity_scores(text) for text in texts]
+        elapsed = time.perf_counter() - started
+        print(f"polarity_scores took {elapsed:.3f}s "
+              f"({len(texts) / elapsed:.0f} docs/s)", file=sys.stderr)
+        mismatches = [text for text, result, scores
+                      in zip(texts, results, expected)
+                      if result["scores"] != scores]
+        if mismatches:
+            print(f"{len(mismatches)} of {len(texts)} scores differ, e.g. "
+                  f"{mismatches[0]!r}", file=sys.stderr)
+            sys.exit(1)
+        print(f"All {len(texts)} scores match polarity_scores",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
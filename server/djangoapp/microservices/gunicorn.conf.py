@@ -0,0 +1,25 @@
+"""Production gunicorn settings for the sentiment analyzer.
+
+Run with:  gunicorn -c gunicorn.conf.py app:app
+
+VADER scoring is CPU-bound, so the service scales with pre-forked worker
+processes rather than threads. The app (and the analyzer with its lexicon)
+is loaded once in the master before forking, and workers share it
+copy-on-write.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WORKERS", multiprocessing.cpu_count()))
+# One request at a time per worker: extra threads only contend for the GIL.
+threads = int(os.getenv("THREADS", "1"))
+preload_app = os.getenv("PRELOAD_APP", "true").lower() != "false"
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+timeout = int(os.getenv("TIMEOUT", "30"))
+keepalive = 5
+
+loglevel = os.getenv("LOG_LEVEL", "info")
+accesslog = os.getenv("ACCESS_LOG") or None
+errorlog = "-"
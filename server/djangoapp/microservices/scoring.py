@@ -0,0 +1,62 @@
+"""VADER scoring shared by the sentiment service and the Django client.
+
+The Flask service and the Django "local" sentiment engine both score texts
+here, so they use the same bundled lexicon and return the same labels.
+nltk is imported only when an analyzer is loaded.
+"""
+import os
+import threading
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Directory holding sentiment/vader_lexicon.zip
+LEXICON_DIR = HERE
+
+
+def sentiment_label(scores):
+    """Map VADER scores to a positive/negative/neutral label."""
+    pos = float(scores['pos'])
+    neg = float(scores['neg'])
+    neu = float(scores['neu'])
+    res = "positive"
+    if (neg > pos and neg > neu):
+        res = "negative"
+    elif (neu > neg and neu > pos):
+        res = "neutral"
+    return res
+
+
+def load_analyzer(lexicon_dir=LEXICON_DIR):
+    """Build a VADER analyzer from the bundled lexicon."""
+    import nltk
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    if lexicon_dir not in nltk.data.path:
+        nltk.data.path.append(lexicon_dir)
+    return SentimentIntensityAnalyzer()
+
+
+def score(analyzer, text):
+    """Return the {"sentiment", "scores"} result for one text."""
+    scores = analyzer.polarity_scores(text)
+    return {"sentiment": sentiment_label(scores), "scores": scores}
+
+
+class LazyAnalyzer:
+    """Analyzer loaded on first use, once per process."""
+
+    def __init__(self, lexicon_dir=LEXICON_DIR):
+        self.lexicon_dir = lexicon_dir
+        self._analyzer = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    self._analyzer = load_analyzer(self.lexicon_dir)
+        return self._analyzer
+
+    def score_many(self, texts):
+        """Return one result per text, in order."""
+        analyzer = self.get()
+        return [score(analyzer, text) for text in texts]
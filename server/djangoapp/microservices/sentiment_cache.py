@@ -0,0 +1,156 @@
+"""Persistent sentiment result cache keyed by a hash of the review text.
+
+Review texts never change once posted, so their scores can be kept on disk
+(SQLite) and survive restarts. The module only uses the standard library so
+both the Flask service and the Django client can import it.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_ENTRIES = 200000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sentiment (
+    text_hash TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+
+def text_hash(text):
+    """Return the cache key for a review text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """Bounded SQLite-backed map from text hash to sentiment result.
+
+    Connections are opened lazily per thread and per process, so the cache
+    is safe to share between threads and across pre-fork workers. The size
+    is checked after every check_every stored entries (per process), and
+    once past max_entries the oldest entries are dropped. stats() reports
+    the size found by the last check, so it may lag by up to check_every.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES,
+                 check_every=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.check_every = check_every or max(1, max_entries // 100)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0}
+        self._unchecked = 0
+        self._size = None
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._counters[key] += amount
+
+    def get(self, text):
+        """Return the cached result for text, or None."""
+        return self.get_many([text]).get(text)
+
+    def get_many(self, texts):
+        """Return {text: result} for every text found in the cache."""
+        hashes = {text_hash(text): text for text in texts}
+        found = {}
+        keys = list(hashes)
+        # Stay below SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection().execute(
+                "SELECT text_hash, result FROM sentiment "
+                f"WHERE text_hash IN ({placeholders})",
+                chunk,
+            )
+            for key, result in rows:
+                found[hashes[key]] = json.loads(result)
+        self._count("hits", len(found))
+        self._count("misses", len(hashes) - len(found))
+        return found
+
+    def put(self, text, result):
+        """Store the result for text."""
+        self.put_many({text: result})
+
+    def _table_size(self, conn):
+        """Count the entries (a table scan) and remember the result."""
+        size = conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        self._size = size
+        return size
+
+    def _due_for_check(self, stored):
+        """Add stored to the tally; True when the size is due a check."""
+        with self._lock:
+            self._unchecked += stored
+            if self._unchecked < self.check_every:
+                return False
+            self._unchecked = 0
+            return True
+
+    def put_many(self, results):
+        """Store every {text: result} pair, evicting the oldest if full."""
+        if not results:
+            return
+        now = time.time()
+        rows = [
+            (text_hash(text), json.dumps(result), now)
+            for text, result in results.items()
+        ]
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?)",
+                rows,
+            )
+            # COUNT(*) scans the table, so it only runs now and then.
+            if self._due_for_check(len(rows)):
+                overflow = self._table_size(conn) - self.max_entries
+                if overflow > 0:
+                    conn.execute(
+                        "DELETE FROM sentiment WHERE text_hash IN ("
+                        "SELECT text_hash FROM sentiment "
+                        "ORDER BY stored_at LIMIT ?)",
+                        (overflow,),
+                    )
+                    self._size = self.max_entries
+        self._count("stores", len(rows))
+
+    def stats(self):
+        """Return hit/miss/store counters and the number of entries.
+
+        The size is the one seen by the last periodic check; it is only
+        counted here if no check has run yet in this process.
+        """
+        size = self._size
+        if size is None:
+            size = self._table_size(self._connection())
+        with self._lock:
+            return {**self._counters, "size": size,
+                    "max_entries": self.max_entries}
+
+
+def load_review_texts(path):
+    """Return the review texts from a reviews.json-shaped file."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return [review["review"] for review in data.get("reviews", [])
+            if review.get("review")]
@@ -0,0 +1,95 @@
+"""
+Request timing middleware.
+
+Records each request's latency and database query count in the metrics
+histograms (see metrics.py) and logs one structured line per request.
+"""
+
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+
+from .metrics import REQUEST_DB_QUERIES, REQUEST_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+class _QueryCounter:
+    """
+    Count the queries run on this thread's database connections.
+
+    Queries that async views run through sync_to_async happen on other
+    threads and are not counted.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._stack = ExitStack()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+
+def _observe(request, response, started, queries):
+    """
+    Record and log one finished request.
+    """
+    elapsed = time.monotonic() - started
+    match = request.resolver_match
+    view = match.view_name if match else "unmatched"
+    REQUEST_DURATION.observe(
+        elapsed,
+        view,
+        request.method,
+        str(response.status_code),
+    )
+    REQUEST_DB_QUERIES.observe(queries, view)
+    logger.info(
+        "Request method=%s path=%s view=%s status=%s duration_ms=%.1f "
+        "db_queries=%d",
+        request.method,
+        request.path,
+        view,
+        response.status_code,
+        elapsed * 1000,
+        queries,
+    )
+
+
+@sync_and_async_middleware
+def request_metrics_middleware(get_response):
+    """
+    Time every request and count its database queries.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            started = time.monotonic()
+            with _QueryCounter() as queries:
+                response = await get_response(request)
+            _observe(request, response, started, queries.count)
+            return response
+
+    else:
+
+        def middleware(request):
+            started = time.monotonic()
+            with _QueryCounter() as queries:
+                response = get_response(request)
+            _observe(request, response, started, queries.count)
+            return response
+
+    return middleware
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0002_carmodel_dealer_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='carmodel',
+            name='car_type',
+            field=models.CharField(choices=[('Sedan', 'Sedan'), ('SUV', 'SUV'), ('Wagon', 'Wagon'), ('Truck', 'Truck'), ('Hatchback', 'Hatchback'), ('Coupe', 'Coupe'), ('Convertible', 'Convertible'), ('Minivan', 'Minivan')], default='Sedan', max_length=12),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:39
+
+from django.db import migrations, models
+
+
+def merge_duplicate_makes(apps, schema_editor):
+    """
+    Point models of duplicate makes at the oldest make with that name and
+    delete the duplicates, so the unique constraint can be added.
+    """
+    CarMake = apps.get_model('djangoapp', 'CarMake')
+    CarModel = apps.get_model('djangoapp', 'CarModel')
+    keep = {}
+    for make in CarMake.objects.order_by('pk'):
+        if make.name not in keep:
+            keep[make.name] = make.pk
+            continue
+        CarModel.objects.filter(make_id=make.pk).update(
+            make_id=keep[make.name])
+        make.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0003_carmodel_more_car_types'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_makes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(fields=['dealer_id', 'make'], name='carmodel_dealer_make_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(fields=['make', 'year'], name='carmodel_make_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(fields=['car_type', 'year'], name='carmodel_type_year_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='carmake',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_carmake_name'),
+        ),
+    ]
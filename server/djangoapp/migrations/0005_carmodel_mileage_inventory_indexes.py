@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0004_carmake_unique_name_carmodel_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carmodel',
+            name='mileage',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(fields=['dealer_id', 'year', 'id'], name='carmodel_dealer_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(fields=['dealer_id', 'mileage', 'id'], name='carmodel_dealer_mileage_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0005_carmodel_mileage_inventory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=150)),
+                ('dealership', models.IntegerField(db_index=True)),
+                ('review', models.TextField()),
+                ('purchase', models.BooleanField(default=False)),
+                ('purchase_date', models.CharField(blank=True, max_length=20)),
+                ('car_make', models.CharField(blank=True, max_length=100)),
+                ('car_model', models.CharField(blank=True, max_length=100)),
+                ('car_year', models.IntegerField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Dealership',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('city', models.CharField(max_length=100)),
+                ('state', models.CharField(max_length=100)),
+                ('st', models.CharField(blank=True, max_length=10)),
+                ('address', models.CharField(blank=True, max_length=200)),
+                ('zip', models.CharField(blank=True, max_length=20)),
+                ('lat', models.FloatField(blank=True, null=True)),
+                ('long', models.FloatField(blank=True, null=True)),
+                ('short_name', models.CharField(blank=True, max_length=100)),
+                ('full_name', models.CharField(blank=True, max_length=200)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['state', 'city', 'id'], name='dealership_state_city_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0006_dealership_review_replica'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DealerReviewStats',
+            fields=[
+                ('dealer_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('positive', models.PositiveIntegerField(default=0)),
+                ('neutral', models.PositiveIntegerField(default=0)),
+                ('negative', models.PositiveIntegerField(default=0)),
+                ('unscored', models.PositiveIntegerField(default=0)),
+                ('purchases', models.PositiveIntegerField(default=0)),
+                ('make_counts', models.JSONField(default=dict)),
+                ('year_counts', models.JSONField(default=dict)),
+                ('rating', models.FloatField(blank=True, db_index=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
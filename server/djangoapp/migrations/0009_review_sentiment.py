@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0008_reviewsubmission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='sentiment',
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='sentiment_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:16
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def merge_case_duplicate_makes(apps, schema_editor):
+    """
+    Point models of makes whose names differ only in case at the oldest
+    such make and delete the others, so the constraint can be added.
+    """
+    CarMake = apps.get_model('djangoapp', 'CarMake')
+    CarModel = apps.get_model('djangoapp', 'CarModel')
+    keep = {}
+    for make in CarMake.objects.order_by('pk'):
+        name = make.name.lower()
+        if name not in keep:
+            keep[name] = make.pk
+            continue
+        CarModel.objects.filter(make_id=make.pk).update(make_id=keep[name])
+        make.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0009_review_sentiment'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_case_duplicate_makes, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='carmake',
+            name='unique_carmake_name',
+        ),
+        migrations.AddConstraint(
+            model_name='carmake',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='unique_carmake_name'),
+        ),
+    ]
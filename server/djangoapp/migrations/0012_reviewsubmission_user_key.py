@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0011_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reviewsubmission',
+            name='idempotency_key',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='reviewsubmission',
+            constraint=models.UniqueConstraint(fields=('username', 'idempotency_key'), name='unique_submission_user_key'),
+        ),
+    ]
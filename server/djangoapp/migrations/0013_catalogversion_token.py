@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:32
+
+import djangoapp.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0012_reviewsubmission_user_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogversion',
+            name='token',
+            field=models.CharField(default=djangoapp.models.new_catalog_token, max_length=32),
+        ),
+    ]
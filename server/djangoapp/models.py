@@ -1,9 +1,14 @@
 """
-Django models for CarMake and CarModel.
+Django models for CarMake and CarModel, the car catalog version, the local
+replica of the backend's dealerships and reviews, per-dealer review
+aggregates and the outbox of reviews waiting to be posted to the backend.
 """
 
+import uuid
+
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Lower
 
 
 class CarMake(models.Model):
@@ -14,6 +19,16 @@ class CarMake(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
 
+    class Meta:
+        constraints = [
+            # Lets bulk imports upsert makes by name; names differing only
+            # in case are the same make, as the importer matches them.
+            models.UniqueConstraint(
+                Lower("name"),
+                name="unique_carmake_name",
+            ),
+        ]
+
     def __str__(self):
         """
         String representation for admin and shell.
@@ -36,6 +51,9 @@ class CarModel(models.Model):
     WAGON = "Wagon"
     TRUCK = "Truck"
     HATCHBACK = "Hatchback"
+    COUPE = "Coupe"
+    CONVERTIBLE = "Convertible"
+    MINIVAN = "Minivan"
 
     TYPE_CHOICES = [
         (SEDAN, "Sedan"),
@@ -43,10 +61,13 @@ class CarModel(models.Model):
         (WAGON, "Wagon"),
         (TRUCK, "Truck"),
         (HATCHBACK, "Hatchback"),
+        (COUPE, "Coupe"),
+        (CONVERTIBLE, "Convertible"),
+        (MINIVAN, "Minivan"),
     ]
 
     car_type = models.CharField(
-        max_length=10,
+        max_length=12,
         choices=TYPE_CHOICES,
         default=SEDAN,
     )
@@ -59,9 +80,233 @@ class CarModel(models.Model):
         ],
     )
 
+    mileage = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Per-dealer inventory lookups.
+            models.Index(
+                fields=["dealer_id", "make"],
+                name="carmodel_dealer_make_idx",
+            ),
+            # Catalog and admin filtering by make and year.
+            models.Index(
+                fields=["make", "year"],
+                name="carmodel_make_year_idx",
+            ),
+            # Filtering by body type and year.
+            models.Index(
+                fields=["car_type", "year"],
+                name="carmodel_type_year_idx",
+            ),
+            # Per-dealer inventory sorted by year or mileage.
+            models.Index(
+                fields=["dealer_id", "year", "id"],
+                name="carmodel_dealer_year_idx",
+            ),
+            models.Index(
+                fields=["dealer_id", "mileage", "id"],
+                name="carmodel_dealer_mileage_idx",
+            ),
+        ]
+
     def __str__(self):
         """
         String representation including make, model and year.
         """
         return f"{self.make.name} {self.name} ({self.year})"
 
+
+def new_catalog_token():
+    """
+    Return a random token identifying one version of the car catalog.
+    """
+    return uuid.uuid4().hex
+
+
+class CatalogVersion(models.Model):
+    """
+    Version of the car catalog, bumped whenever a CarMake or CarModel is
+    written.
+
+    A single row (pk=1). It lives in the database rather than the cache so
+    every worker process sees an invalidation made by any other; see
+    djangoapp.catalog. Cached responses are keyed by token, which is new on
+    every bump: the counter can repeat after a rollback, a restore or a
+    flush, a random token does not.
+    """
+
+    version = models.PositiveIntegerField(default=1)
+    token = models.CharField(max_length=32, default=new_catalog_token)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        String representation for admin and shell.
+        """
+        return f"Catalog version {self.version}"
+
+
+class ReplicaSyncState(models.Model):
+    """
+    Progress of the sync_replica command through the backend's reviews.
+
+    A single row (pk=1), written only by sync_replica. The Review table
+    itself cannot serve as the cursor: reviews written through from this
+    app may carry higher ids than backend reviews not yet synced.
+    """
+
+    # Highest backend review id fetched by sync_replica
+    review_cursor = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        String representation for admin and shell.
+        """
+        return f"Replica synced up to review {self.review_cursor}"
+
+
+class Dealership(models.Model):
+    """
+    Local replica of a dealership from the backend service.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    city = models.CharField(max_length=100)
+    state = models.CharField(max_length=100)
+    st = models.CharField(max_length=10, blank=True)
+    address = models.CharField(max_length=200, blank=True)
+    zip = models.CharField(max_length=20, blank=True)
+    lat = models.FloatField(null=True, blank=True)
+    long = models.FloatField(null=True, blank=True)
+    short_name = models.CharField(max_length=100, blank=True)
+    full_name = models.CharField(max_length=200, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["state", "city", "id"],
+                name="dealership_state_city_idx",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        String representation for admin and shell.
+        """
+        return str(self.full_name)
+
+
+class Review(models.Model):
+    """
+    Local replica of a dealer review from the backend service.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=150)
+    dealership = models.IntegerField(db_index=True)
+    review = models.TextField()
+    purchase = models.BooleanField(default=False)
+    purchase_date = models.CharField(max_length=20, blank=True)
+    car_make = models.CharField(max_length=100, blank=True)
+    car_model = models.CharField(max_length=100, blank=True)
+    car_year = models.IntegerField(null=True, blank=True)
+    # Scored when the review is written; blank until then for older
+    # reviews (see backfill_review_sentiments).
+    sentiment = models.CharField(max_length=10, blank=True)
+    sentiment_score = models.FloatField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        String representation for admin and shell.
+        """
+        return f"Review {self.id} for dealer {self.dealership}"
+
+
+class DealerReviewStats(models.Model):
+    """
+    Review aggregates for one dealer, kept current as reviews are added.
+
+    Maintained by djangoapp.reviewstats; rebuild_review_stats recomputes
+    every row from the backend's reviews.
+    """
+
+    dealer_id = models.IntegerField(primary_key=True)
+    review_count = models.PositiveIntegerField(default=0)
+    positive = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    unscored = models.PositiveIntegerField(default=0)
+    purchases = models.PositiveIntegerField(default=0)
+    # {make name: review count} and {car year: review count}
+    make_counts = models.JSONField(default=dict)
+    year_counts = models.JSONField(default=dict)
+    # Share of scored reviews that are positive (neutral counts as half),
+    # or None while no review has been scored.
+    rating = models.FloatField(null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        String representation for admin and shell.
+        """
+        return f"Review stats for dealer {self.dealer_id}"
+
+
+class ReviewSubmission(models.Model):
+    """
+    A submitted review waiting in the outbox to be posted to the backend.
+
+    Rows are delivered by djangoapp.outbox; the idempotency key is unique
+    per user and is sent with the review, scoped by username, so
+    redelivery never creates a duplicate.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATE_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    idempotency_key = models.CharField(max_length=64)
+    username = models.CharField(max_length=150)
+    payload = models.JSONField()
+    state = models.CharField(
+        max_length=10,
+        choices=STATE_CHOICES,
+        default=PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(blank=True)
+    review_id = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Keys are chosen by clients, so two users may send the same.
+            models.UniqueConstraint(
+                fields=["username", "idempotency_key"],
+                name="unique_submission_user_key",
+            ),
+        ]
+        indexes = [
+            # The worker polls for due pending submissions.
+            models.Index(
+                fields=["state", "next_attempt_at"],
+                name="submission_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        String representation for admin and shell.
+        """
+        return f"Review submission {self.idempotency_key} ({self.state})"
@@ -0,0 +1,323 @@
+"""
+Durable outbox for review submissions.
+
+add_review and add_reviews store each review as a ReviewSubmission and
+answer at once; reviews are posted to the backend afterwards, a batch per
+request, either by a background drain started after the submissions are
+committed or by the drain_review_outbox worker. Failed deliveries are
+retried with exponential backoff, and every review carries its
+submission's idempotency key, prefixed with the username, so the backend
+stores it only once however often it is redelivered. Reviews are scored
+just before they are posted and stored with their sentiment label, so
+reads need not score them.
+"""
+
+import logging
+import os
+import random
+import threading
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import ReviewSubmission
+from .restapis import score_reviews, submit_review, submit_reviews
+from .reviewstats import record_posted_reviews
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = int(os.getenv("review_outbox_batch_size", default="50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("review_outbox_max_attempts", default="8"))
+# Retry delay: backoff * 2 ** (attempts - 1) seconds, capped at max_backoff.
+OUTBOX_BACKOFF = float(os.getenv("review_outbox_backoff", default="2"))
+OUTBOX_MAX_BACKOFF = float(
+    os.getenv("review_outbox_max_backoff", default="300"),
+)
+# Seconds a claimed submission is hidden from other workers; a worker that
+# dies mid-delivery leaves it to be picked up again after this.
+OUTBOX_LEASE = float(os.getenv("review_outbox_lease", default="60"))
+# Start a background drain in the web process after each submission.
+OUTBOX_AUTODRAIN = os.getenv(
+    "review_outbox_autodrain",
+    default="true",
+).lower() in ("1", "true", "yes")
+
+_draining = threading.Lock()
+
+
+def enqueue_review(data, username, idempotency_key=None):
+    """
+    Store a review for delivery and return (submission, created).
+
+    Submitting again with the same idempotency key returns the user's
+    existing submission instead of queueing a duplicate.
+    """
+    key = idempotency_key or uuid.uuid4().hex
+    existing = ReviewSubmission.objects.filter(
+        username=username,
+        idempotency_key=key,
+    ).first()
+    if existing is not None:
+        return existing, False
+    try:
+        with transaction.atomic():
+            submission = ReviewSubmission.objects.create(
+                username=username,
+                idempotency_key=key,
+                payload=data,
+                next_attempt_at=timezone.now(),
+            )
+    except IntegrityError:
+        # A concurrent request with the same key stored it first.
+        existing = ReviewSubmission.objects.get(
+            username=username,
+            idempotency_key=key,
+        )
+        return existing, False
+    if OUTBOX_AUTODRAIN:
+        transaction.on_commit(drain_in_background)
+    return submission, True
+
+
+def enqueue_reviews(reviews, username):
+    """
+    Store a batch of (data, idempotency_key) pairs for delivery.
+
+    Keys may be None to generate one. Returns the submissions in order;
+    pairs whose key the user already queued map to the existing submission.
+    """
+    now = timezone.now()
+    keys = [key or uuid.uuid4().hex for _, key in reviews]
+    with transaction.atomic():
+        ReviewSubmission.objects.bulk_create(
+            [
+                ReviewSubmission(
+                    idempotency_key=key,
+                    username=username,
+                    payload=data,
+                    next_attempt_at=now,
+                )
+                for (data, _), key in zip(reviews, keys)
+            ],
+            ignore_conflicts=True,
+        )
+        if OUTBOX_AUTODRAIN:
+            transaction.on_commit(drain_in_background)
+    submissions = {
+        submission.idempotency_key: submission
+        for submission in ReviewSubmission.objects.filter(
+            username=username,
+            idempotency_key__in=keys,
+        )
+    }
+    return [submissions[key] for key in keys]
+
+
+def _retry_delay(attempts):
+    """
+    Return the backoff in seconds before retry number attempts, jittered.
+    """
+    delay = min(OUTBOX_BACKOFF * 2 ** (attempts - 1), OUTBOX_MAX_BACKOFF)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _claim(limit):
+    """
+    Lease up to limit due submissions to this worker and return them.
+
+    A row is claimed by moving its next attempt past the lease with a
+    conditional UPDATE, so concurrent workers never deliver it twice.
+    """
+    now = timezone.now()
+    due = ReviewSubmission.objects.filter(
+        state=ReviewSubmission.PENDING,
+        next_attempt_at__lte=now,
+    ).order_by("next_attempt_at", "id")
+    claimed = []
+    for submission in due[:limit]:
+        leased_until = now + timedelta(seconds=OUTBOX_LEASE)
+        won = ReviewSubmission.objects.filter(
+            pk=submission.pk,
+            state=ReviewSubmission.PENDING,
+            next_attempt_at=submission.next_attempt_at,
+        ).update(next_attempt_at=leased_until)
+        if won:
+            submission.next_attempt_at = leased_until
+            claimed.append(submission)
+    return claimed
+
+
+def _payload(submission):
+    """
+    Return the review to post for a submission, with its idempotency key.
+
+    The backend's keys are global, so the key is prefixed with the
+    username (usernames cannot contain ":").
+    """
+    return {
+        **submission.payload,
+        "idempotency_key": (
+            f"{submission.username}:{submission.idempotency_key}"
+        ),
+    }
+
+
+def _mark_sent(submission, review):
+    """
+    Record that the backend stored a submission's review.
+    """
+    submission.state = ReviewSubmission.SENT
+    submission.review_id = review.get("id")
+    submission.last_error = ""
+    submission.save()
+
+
+def _mark_failed(submission, retryable):
+    """
+    Reschedule a failed delivery with backoff, or give up on it.
+    """
+    if retryable and submission.attempts < OUTBOX_MAX_ATTEMPTS:
+        submission.last_error = "Backend unavailable; will retry."
+        submission.next_attempt_at = timezone.now() + timedelta(
+            seconds=_retry_delay(submission.attempts),
+        )
+    else:
+        submission.state = ReviewSubmission.FAILED
+        submission.last_error = (
+            "Backend rejected the review."
+            if not retryable
+            else "Backend unavailable; gave up."
+        )
+    submission.save()
+
+
+def deliver(submission, payload=None):
+    """
+    Post one claimed submission to the backend and record the outcome.
+
+    The review is scored first, so it is stored with its sentiment label,
+    unless an already scored payload is given. Returns the submission's
+    new state.
+    """
+    if payload is None:
+        payload = score_reviews([_payload(submission)])[0]
+    review, retryable = submit_review(payload)
+    submission.attempts += 1
+    if review is not None:
+        _mark_sent(submission, review)
+        record_posted_reviews([review])
+    else:
+        _mark_failed(submission, retryable)
+    return submission.state
+
+
+def deliver_batch(submissions):
+    """
+    Post claimed submissions to the backend in one request, after scoring
+    their reviews in one sentiment batch call.
+
+    If the backend rejects the batch, each submission is retried on its
+    own so one invalid review does not hold back the rest. Returns the
+    submissions' new states, in order.
+    """
+    payloads = score_reviews(
+        [_payload(submission) for submission in submissions],
+    )
+    stored, retryable = submit_reviews(payloads)
+    if stored is None and not retryable:
+        return [
+            deliver(submission, payload)
+            for submission, payload in zip(submissions, payloads)
+        ]
+
+    with transaction.atomic():
+        for index, submission in enumerate(submissions):
+            submission.attempts += 1
+            if stored is not None:
+                _mark_sent(submission, stored[index])
+            else:
+                _mark_failed(submission, retryable)
+    if stored is not None:
+        record_posted_reviews(stored)
+    return [submission.state for submission in submissions]
+
+
+def drain(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Deliver due submissions in batches until none are left.
+
+    Returns how many submissions were sent, rescheduled and failed.
+    """
+    counts = {"sent": 0, "retrying": 0, "failed": 0}
+    while True:
+        batch = _claim(batch_size)
+        if not batch:
+            return counts
+        for state in deliver_batch(batch):
+            if state == ReviewSubmission.PENDING:
+                counts["retrying"] += 1
+            else:
+                counts[state] += 1
+
+
+def _has_due():
+    """
+    Return True if a pending submission is due for delivery.
+    """
+    return ReviewSubmission.objects.filter(
+        state=ReviewSubmission.PENDING,
+        next_attempt_at__lte=timezone.now(),
+    ).exists()
+
+
+def drain_in_background():
+    """
+    Drain the outbox on a daemon thread, unless one is already draining.
+
+    A submission committed while the drain is finishing finds the lock
+    held and leaves its delivery to that drain, so after releasing the
+    lock the drain looks for due submissions once more and, if it wins
+    the lock again, carries on.
+    """
+    if not _draining.acquire(blocking=False):  # pylint: disable=consider-using-with
+        return
+
+    def run():
+        try:
+            while True:
+                try:
+                    drain()
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.error("Error draining review outbox: %s", exc)
+                    return
+                finally:
+                    _draining.release()
+                if not _has_due():
+                    return
+                if not _draining.acquire(blocking=False):  # pylint: disable=consider-using-with
+                    return
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def serialize_submission(submission):
+    """
+    Return the JSON representation of a ReviewSubmission's state.
+    """
+    return {
+        "id": submission.idempotency_key,
+        "state": submission.state,
+        "attempts": submission.attempts,
+        "review_id": submission.review_id,
+        "last_error": submission.last_error or None,
+        "next_attempt_at": (
+            submission.next_attempt_at.isoformat()
+            if submission.state == ReviewSubmission.PENDING
+            else None
+        ),
+        "created_at": submission.created_at.isoformat(),
+    }
@@ -1,2 +1,24 @@
-def initiate():
-    print("Populate not implemented. Add data manually")
+"""
+Populate the car catalog from the inventory records shipped with the
+database service.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+
+from .importer import DEFAULT_BATCH_SIZE, CarImporter
+
+DEFAULT_CAR_RECORDS_PATH = (
+    Path(settings.BASE_DIR) / "database" / "data" / "car_records.json"
+)
+
+
+def initiate(path=DEFAULT_CAR_RECORDS_PATH, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Import car makes and models from a car_records.json-shaped file.
+
+    Safe to call repeatedly; records already imported are skipped.
+    Returns the importer stats.
+    """
+    return CarImporter(batch_size=batch_size).import_path(path)
@@ -0,0 +1,197 @@
+"""
+Local read replica of the backend's dealerships and reviews.
+
+The sync_replica management command fills the Dealership and Review
+tables from the backend; with DEALER_DATA_SOURCE = "replica" the restapis
+read functions are served from here instead of over HTTP. Records are
+returned in the same JSON shape the backend produces.
+"""
+
+from .models import Dealership, ReplicaSyncState, Review
+
+DEALERSHIP_FIELDS = (
+    "id",
+    "city",
+    "state",
+    "st",
+    "address",
+    "zip",
+    "lat",
+    "long",
+    "short_name",
+    "full_name",
+)
+REVIEW_FIELDS = (
+    "id",
+    "name",
+    "dealership",
+    "review",
+    "purchase",
+    "purchase_date",
+    "car_make",
+    "car_model",
+    "car_year",
+    "sentiment",
+    "sentiment_score",
+)
+
+
+# -------------------------------------------------------------
+# READS
+# -------------------------------------------------------------
+
+
+def get_dealers(state=None):
+    """
+    Return the replicated dealers, optionally only those in state.
+    """
+    dealers = Dealership.objects.order_by("id")
+    if state:
+        dealers = dealers.filter(state=state)
+    return list(dealers.values(*DEALERSHIP_FIELDS))
+
+
+def get_dealers_page(
+    state=None,
+    city=None,
+    zip_prefix=None,
+    after=None,
+    limit=None,
+    fields=None,
+):
+    """
+    Return one page of replicated dealers; see restapis.get_dealers_page.
+    """
+    dealers = Dealership.objects.order_by("id")
+    if state:
+        dealers = dealers.filter(state=state)
+    if city:
+        dealers = dealers.filter(city=city)
+    if zip_prefix:
+        dealers = dealers.filter(zip__startswith=zip_prefix)
+    if after:
+        dealers = dealers.filter(id__gt=after)
+    columns = DEALERSHIP_FIELDS
+    if fields:
+        columns = ("id", *(f for f in fields if f != "id"))
+    dealers = dealers.values(*columns)
+    if limit:
+        dealers = dealers[:limit]
+    return list(dealers)
+
+
+def get_dealer_details(dealer_id):
+    """
+    Return the replicated dealer with dealer_id, or None.
+    """
+    return (
+        Dealership.objects.filter(id=dealer_id)
+        .values(*DEALERSHIP_FIELDS)
+        .first()
+    )
+
+
+def get_reviews_for_dealer(dealer_id):
+    """
+    Return the replicated reviews for dealer_id, or None if there are none.
+    """
+    reviews = list(
+        Review.objects.filter(dealership=dealer_id)
+        .order_by("id")
+        .values(*REVIEW_FIELDS),
+    )
+    return reviews or None
+
+
+# -------------------------------------------------------------
+# SYNC
+# -------------------------------------------------------------
+
+
+def _text(record, field):
+    """
+    Return a text field of a backend record, "" if missing.
+    """
+    value = record.get(field)
+    return "" if value is None else str(value)
+
+
+def upsert_dealers(records):
+    """
+    Insert or update replicated dealers from backend records.
+
+    Returns the number of records written.
+    """
+    dealers = [
+        Dealership(
+            id=record["id"],
+            city=_text(record, "city"),
+            state=_text(record, "state"),
+            st=_text(record, "st"),
+            address=_text(record, "address"),
+            zip=_text(record, "zip"),
+            lat=record.get("lat"),
+            long=record.get("long"),
+            short_name=_text(record, "short_name"),
+            full_name=_text(record, "full_name"),
+        )
+        for record in records
+        if record.get("id") is not None
+    ]
+    Dealership.objects.bulk_create(
+        dealers,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=[*DEALERSHIP_FIELDS[1:], "synced_at"],
+    )
+    return len(dealers)
+
+
+def upsert_reviews(records):
+    """
+    Insert or update replicated reviews from backend records.
+
+    Returns the number of records written.
+    """
+    reviews = [
+        Review(
+            id=record["id"],
+            name=_text(record, "name"),
+            dealership=int(record.get("dealership") or 0),
+            review=_text(record, "review"),
+            purchase=bool(record.get("purchase")),
+            purchase_date=_text(record, "purchase_date"),
+            car_make=_text(record, "car_make"),
+            car_model=_text(record, "car_model"),
+            car_year=record.get("car_year"),
+            sentiment=_text(record, "sentiment"),
+            sentiment_score=record.get("sentiment_score"),
+        )
+        for record in records
+        if record.get("id") is not None
+    ]
+    Review.objects.bulk_create(
+        reviews,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=[*REVIEW_FIELDS[1:], "synced_at"],
+    )
+    return len(reviews)
+
+
+def review_sync_cursor():
+    """
+    Return the highest backend review id synced so far (0 if none).
+    """
+    state = ReplicaSyncState.objects.filter(pk=1).first()
+    return state.review_cursor if state else 0
+
+
+def advance_review_sync_cursor(last_id):
+    """
+    Record that backend reviews up to last_id have been synced.
+    """
+    ReplicaSyncState.objects.update_or_create(
+        pk=1,
+        defaults={"review_cursor": last_id},
+    )
@@ -0,0 +1,237 @@
+"""
+Bounded in-process cache for proxied backend responses.
+
+Entries expire after a per-entry TTL and the least recently used entry is
+evicted once the cache is full. Expired entries can be kept for an extra
+stale window so callers may still serve them while refreshing, or when the
+backend is down.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+CACHE_MAX_ENTRIES = int(os.getenv("cache_max_entries", default="512"))
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry and hit/miss counters.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return default
+
+            value, fresh_until, _ = entry
+            if fresh_until <= self._clock():
+                self._expire(key)
+                self._counters["misses"] += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def get_entry(self, key):
+        """
+        Return (value, is_fresh) for key, or None if missing.
+
+        Entries past their TTL but inside their stale window are returned
+        with is_fresh False.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+
+            value, fresh_until, stale_until = entry
+            now = self._clock()
+            if stale_until <= now:
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if fresh_until <= now:
+                self._counters["stale_hits"] += 1
+                return value, False
+
+            self._counters["hits"] += 1
+            return value, True
+
+    def _expire(self, key):
+        """
+        Drop key unless it is still inside its stale window.
+
+        Must be called with the lock held.
+        """
+        if self._entries[key][2] <= self._clock():
+            del self._entries[key]
+            self._counters["expirations"] += 1
+
+    def set(self, key, value, ttl, stale_ttl=0):
+        """
+        Store value under key for ttl seconds, evicting the LRU entry if full.
+
+        The entry may still be served as stale for stale_ttl more seconds.
+        """
+        with self._lock:
+            fresh_until = self._clock() + ttl
+            self._entries[key] = (value, fresh_until, fresh_until + stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, key):
+        """
+        Drop the entry for key, if present.
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def clear(self):
+        """
+        Drop every entry (counters are kept).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return a snapshot of the cache counters and current size.
+        """
+        with self._lock:
+            return {
+                **self._counters,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+class _Call:
+    """
+    A single in-flight call shared by every caller with the same key.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is still
+    running wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, func):
+        """
+        Run func for key, or wait for the call already running for key.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._counters["calls"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = func()
+            except Exception as exc:  # pylint: disable=broad-except
+                call.error = exc
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        """
+        Return how many calls ran and how many were coalesced into them.
+        """
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    Coroutine counterpart of ``SingleFlight``.
+
+    Calls are tracked per event loop, since a task can only be awaited from
+    the loop that runs it.
+    """
+
+    def __init__(self):
+        self._calls = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key, func):
+        """
+        Await func() for key, or join the task already running for key.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._calls.setdefault(loop, {})
+            task = calls.get(key)
+            if task is None:
+                task = calls[key] = loop.create_task(func())
+                task.add_done_callback(lambda _: calls.pop(key, None))
+                self._counters["calls"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        # Shield so one cancelled waiter does not cancel the shared call.
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """
+        Return how many calls ran and how many were coalesced into them.
+        """
+        with self._lock:
+            return dict(self._counters)
@@ -1,36 +1,232 @@
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
 import requests
+from asgiref.sync import sync_to_async
 from dotenv import load_dotenv
 
+from . import replica
+from .httpclient import async_client as async_http_client
+from .httpclient import circuit_breakers
+from .httpclient import client as http_client
+from .metrics import register_collector
+from .microservices.scoring import LazyAnalyzer
+from .microservices.sentiment_cache import SentimentCache
+from .responsecache import AsyncSingleFlight, SingleFlight, TTLCache
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 BACKEND_URL = os.getenv("backend_url", default="http://localhost:3030")
 SENTIMENT_ANALYZER_URL = os.getenv(
     "sentiment_analyzer_url",
     default="http://localhost:5002",
 )
 
+# "remote" proxies dealer and review reads to the backend; "replica" serves
+# them from the local tables kept current by the sync_replica command.
+DEALER_DATA_SOURCE = os.getenv("dealer_data_source", default="remote")
+
+# Seconds each proxied response stays cached.
+DEALERS_CACHE_TTL = float(os.getenv("cache_ttl_dealers", default="300"))
+DEALER_CACHE_TTL = float(os.getenv("cache_ttl_dealer", default="300"))
+REVIEWS_CACHE_TTL = float(os.getenv("cache_ttl_reviews", default="60"))
+
+# Seconds an expired entry may still be served while refreshing, or while
+# the backend is unreachable.
+CACHE_STALE_TTL = float(os.getenv("cache_stale_ttl", default="3600"))
+# When enabled, stale entries are returned immediately and refreshed in the
+# background instead of blocking the request on the backend.
+CACHE_STALE_WHILE_REVALIDATE = os.getenv(
+    "cache_stale_while_revalidate",
+    default="true",
+).lower() in ("1", "true", "yes")
+
+# Texts per /analyze/batch request; must not exceed the sentiment service's
+# MAX_BATCH_SIZE.
+SENTIMENT_BATCH_SIZE = int(os.getenv("sentiment_batch_size", default="1000"))
+
+# "remote" sends texts to the sentiment service; "local" scores them in
+# this process with the service's VADER lexicon and labels (needs nltk).
+SENTIMENT_ENGINE = os.getenv("sentiment_engine", default="remote")
+
+# On-disk sentiment cache keyed by review text hash; review texts are
+# immutable, so a scored text never needs to be sent to the service again.
+SENTIMENT_CACHE_PATH = os.getenv(
+    "sentiment_cache_path",
+    default=os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "sentiment_cache.sqlite3",
+    ),
+)
+SENTIMENT_CACHE_MAX_ENTRIES = int(
+    os.getenv("sentiment_cache_max_entries", default="200000"),
+)
+
+response_cache = TTLCache()
+sentiment_cache = SentimentCache(
+    SENTIMENT_CACHE_PATH,
+    SENTIMENT_CACHE_MAX_ENTRIES,
+)
+# Loaded on first use, once per worker process.
+local_analyzer = LazyAnalyzer()
+inflight_requests = SingleFlight()
+async_inflight_requests = AsyncSingleFlight()
+
+# Threads fetching dealer details while the dealer page's reviews load.
+dealer_page_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("dealer_page_workers", default="8")),
+    thread_name_prefix="dealer-page",
+)
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _load_into_cache(key, ttl, loader):
+    """
+    Call loader and cache its result; failed loads (None) are not cached.
+    """
+    value = loader()
+    if value is not None:
+        response_cache.set(key, value, ttl, stale_ttl=CACHE_STALE_TTL)
+    return value
+
+
+def _refresh_in_background(key, ttl, loader):
+    """
+    Refresh a stale entry on a daemon thread, at most once per key at a time.
+    """
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            _load_into_cache(key, ttl, loader)
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def _cache_lookup(key, ttl, loader):
+    """
+    Look key up for _cached/_cached_async.
+
+    Returns (entry, serve): serve is True when the cached value should be
+    returned without loading, in which case a stale value has already been
+    scheduled for a background refresh.
+    """
+    entry = response_cache.get_entry(key)
+    if entry is None:
+        return None, False
+
+    if entry[1]:
+        return entry, True
+    if CACHE_STALE_WHILE_REVALIDATE:
+        _refresh_in_background(key, ttl, loader)
+        return entry, True
+    return entry, False
+
+
+def _stale_fallback(key, value, entry):
+    """
+    Return value, or the stale cached value when the load failed.
+    """
+    if value is None and entry is not None:
+        logger.warning("Serving stale cache entry key=%s", key)
+        return entry[0]
+    return value
+
+
+def _cached(key, ttl, loader):
+    """
+    Return the cached value for key, calling loader on a miss.
+
+    Stale entries are served immediately (and refreshed in the background)
+    in stale-while-revalidate mode, and always served as a fallback when
+    the loader fails.
+    """
+    entry, serve = _cache_lookup(key, ttl, loader)
+    if serve:
+        return entry[0]
+
+    value = _load_into_cache(key, ttl, loader)
+    return _stale_fallback(key, value, entry)
+
+
+async def _cached_async(key, ttl, loader, async_loader):
+    """
+    Async variant of _cached: misses are loaded with async_loader.
+
+    Background refreshes of stale entries still use the blocking loader on
+    a thread, so they outlive the request's event loop.
+    """
+    entry, serve = _cache_lookup(key, ttl, loader)
+    if serve:
+        return entry[0]
+
+    value = await async_loader()
+    if value is not None:
+        response_cache.set(key, value, ttl, stale_ttl=CACHE_STALE_TTL)
+    return _stale_fallback(key, value, entry)
+
 
 def get_request(endpoint, **kwargs):
     """
     Perform a GET request to the backend service.
 
+    Concurrent identical requests share a single upstream call, so callers
+    must treat the returned JSON as read-only.
+
     Returns parsed JSON on success, or None on error.
     """
+    key = (endpoint, tuple(sorted(kwargs.items())))
+    return inflight_requests.do(key, lambda: _get_backend(endpoint, kwargs))
+
+
+def _get_backend(endpoint, params):
+    """
+    Send one GET to the backend service and parse the JSON response.
+    """
     request_url = f"{BACKEND_URL}{endpoint}"
-    print(f"GET from {request_url} with params: {kwargs}")
+    logger.debug("Backend GET endpoint=%s params=%s", endpoint, params)
 
     try:
-        response = requests.get(request_url, params=kwargs, timeout=10)
+        response = http_client.get(
+            request_url,
+            params=params,
+            endpoint=_endpoint_label(endpoint),
+        )
     except requests.exceptions.RequestException as exc:
-        print(f"Network error occurred: {exc}")
+        logger.warning("Backend GET failed endpoint=%s error=%s", endpoint, exc)
         return None
 
     if response.status_code == 200:
         return response.json()
 
-    print(f"HTTP Status {response.status_code} for URL: {request_url}")
+    logger.warning(
+        "Backend GET failed endpoint=%s status=%s",
+        endpoint,
+        response.status_code,
+    )
+    return None
+
+
+def _endpoint_label(endpoint):
+    """
+    Return the metrics label for backend endpoints embedding free-form
+    values, or None to derive it from the path.
+    """
+    if endpoint.startswith("/fetchDealers/"):
+        return "/fetchDealers/:state"
     return None
 
 
@@ -45,37 +241,144 @@ def get_dealers(state=None):
 
     If state is provided, fetch by state; otherwise fetch all.
     """
-    endpoint = "/fetchDealers"
+    if _use_replica():
+        return replica.get_dealers(state)
+    return _cached(
+        ("dealers", state or ""),
+        DEALERS_CACHE_TTL,
+        lambda: _fetch_dealers(state),
+    )
+
+
+def _use_replica():
+    """
+    Return True when dealer and review reads come from the local replica.
+    """
+    return DEALER_DATA_SOURCE == "replica"
+
+
+def _dealers_endpoint(state):
+    """
+    Return the backend endpoint listing dealers, optionally by state.
+    """
     if state:
-        endpoint = f"/fetchDealers/{state}"
+        return f"/fetchDealers/{state}"
+    return "/fetchDealers"
+
 
-    json_result = get_request(endpoint)
+def _unwrap_dealers(json_result):
+    """
+    Return the dealer list from a /fetchDealers response.
+    """
     if json_result and "dealers" in json_result:
         return json_result["dealers"]
-
     return json_result
 
 
+def _fetch_dealers(state):
+    """
+    Fetch the dealer list from the backend, bypassing the cache.
+    """
+    return _unwrap_dealers(get_request(_dealers_endpoint(state)))
+
+
+def get_dealers_page(
+    state=None,
+    city=None,
+    zip_prefix=None,
+    after=None,
+    limit=None,
+    fields=None,
+):
+    """
+    Retrieve one page of dealers, filtered and projected by the backend.
+
+    after is the last dealer id of the previous page; fields limits the
+    returned attributes (id is always included).
+    """
+    if _use_replica():
+        return replica.get_dealers_page(
+            state,
+            city,
+            zip_prefix,
+            after,
+            limit,
+            fields,
+        )
+    params = {
+        "state": state,
+        "city": city,
+        "zip": zip_prefix,
+        "after": after,
+        "limit": limit,
+        "fields": ",".join(fields) if fields else None,
+    }
+    params = {key: value for key, value in params.items() if value}
+    return _cached(
+        ("dealers_page", tuple(sorted(params.items()))),
+        DEALERS_CACHE_TTL,
+        lambda: _unwrap_dealers(get_request("/fetchDealers", **params)),
+    )
+
+
 def get_dealer_details(dealer_id):
     """
     Retrieve details for a specific dealer.
     """
+    if _use_replica():
+        return replica.get_dealer_details(dealer_id)
     endpoint = f"/fetchDealer/{dealer_id}"
-    json_result = get_request(endpoint)
-    if json_result:
-        return json_result
-    return None
+    return _cached(
+        ("dealer", str(dealer_id)),
+        DEALER_CACHE_TTL,
+        lambda: get_request(endpoint) or None,
+    )
 
 
 def get_reviews_for_dealer(dealer_id):
     """
     Retrieve reviews for a specific dealer.
     """
+    if _use_replica():
+        return replica.get_reviews_for_dealer(dealer_id)
     endpoint = f"/fetchReviews/dealer/{dealer_id}"
-    json_result = get_request(endpoint)
-    if json_result:
-        return json_result
-    return None
+    return _cached(
+        ("reviews", str(dealer_id)),
+        REVIEWS_CACHE_TTL,
+        lambda: get_request(endpoint) or None,
+    )
+
+
+def get_reviews_with_sentiments(dealer_id):
+    """
+    Fetch a dealer's reviews with their stored sentiment labels, scoring
+    any review stored without one in a single batch call.
+
+    Returns a list of reviews each carrying a "sentiment" label.
+    """
+    reviews = get_reviews_for_dealer(dealer_id) or []
+    sentiments = analyze_review_sentiments_batch(unscored_texts(reviews))
+    return with_sentiments(reviews, sentiments)
+
+
+def get_dealer_with_reviews(dealer_id):
+    """
+    Fetch a dealer's details and its sentiment-labelled reviews.
+
+    From the backend, the dealer details are fetched on a pool thread
+    while this thread fetches the reviews; replica reads are local queries
+    and run in turn.
+
+    Returns (dealer, reviews); dealer is None if it could not be fetched.
+    """
+    if _use_replica():
+        return (
+            get_dealer_details(dealer_id),
+            get_reviews_with_sentiments(dealer_id),
+        )
+    dealer = dealer_page_pool.submit(get_dealer_details, dealer_id)
+    reviews = get_reviews_with_sentiments(dealer_id)
+    return dealer.result(), reviews
 
 
 # -------------------------------------------------------------
@@ -86,35 +389,597 @@ def get_reviews_for_dealer(dealer_id):
 def analyze_review_sentiments(text):
     """
     Analyze sentiment for the given text using microservice.
+
+    Results are served from the sentiment cache when the text was seen.
+    The service answers this request with the label only, so the answer
+    is not cached: cache entries carry the "scores" batch callers need.
+    With the local engine the text is scored in process instead.
     """
+    if _use_local_engine():
+        return local_analyzer.score_many([text])[0]
+    cached = sentiment_cache.get(text)
+    if cached is not None:
+        return cached
+
     request_url = f"{SENTIMENT_ANALYZER_URL}/analyze/{text}"
     try:
-        response = requests.get(request_url, timeout=10)
+        response = http_client.get(request_url, endpoint="/analyze/:text")
     except requests.exceptions.RequestException as exc:
-        print(f"Error connecting to sentiment API: {exc}")
+        logger.warning("Sentiment request failed error=%s", exc)
         return {"sentiment": "N/A"}
 
     if response.status_code == 200:
         return response.json()
 
-    print(f"Sentiment API failed with status: {response.status_code}")
+    logger.warning(
+        "Sentiment request failed status=%s",
+        response.status_code,
+    )
     return {"sentiment": "N/A"}
 
 
+def _use_local_engine():
+    """
+    Return True when sentiment is scored in process rather than by the
+    sentiment service.
+    """
+    return SENTIMENT_ENGINE == "local"
+
+
+def _batch_results(texts, response):
+    """
+    Return the per-text results of an /analyze/batch response, or N/A
+    labels for every text when the batch failed.
+    """
+    if response is not None and response.status_code == 200:
+        results = response.json().get("results", [])
+        if len(results) == len(texts):
+            return results
+        logger.warning(
+            "Sentiment batch returned %s results for %s texts",
+            len(results),
+            len(texts),
+        )
+    elif response is not None:
+        logger.warning(
+            "Sentiment batch failed status=%s",
+            response.status_code,
+        )
+    return [{"sentiment": "N/A"} for _ in texts]
+
+
+def _batches(texts):
+    """
+    Split texts into /analyze/batch requests of SENTIMENT_BATCH_SIZE.
+    """
+    return [
+        texts[start:start + SENTIMENT_BATCH_SIZE]
+        for start in range(0, len(texts), SENTIMENT_BATCH_SIZE)
+    ]
+
+
+def _split_cached(texts):
+    """
+    Return (cached results by text, distinct texts missing from the cache).
+
+    Entries without "scores" (cached from single-text requests by earlier
+    versions) count as missing.
+    """
+    cached = {
+        text: result
+        for text, result in sentiment_cache.get_many(texts).items()
+        if "scores" in result
+    }
+    missing = list(dict.fromkeys(t for t in texts if t not in cached))
+    return cached, missing
+
+
+def _merge_scored(texts, cached, missing, scored):
+    """
+    Cache newly scored results and return one result per text, in order.
+    """
+    fresh = dict(zip(missing, scored))
+    sentiment_cache.put_many(
+        {t: r for t, r in fresh.items() if r.get("sentiment") != "N/A"},
+    )
+    cached.update(fresh)
+    return [cached[text] for text in texts]
+
+
+def analyze_review_sentiments_batch(texts):
+    """
+    Analyze sentiment for a list of texts in one microservice call.
+
+    Only texts missing from the sentiment cache are sent to the service,
+    SENTIMENT_BATCH_SIZE per request. Returns one result per text, in
+    order; each has a "sentiment" label
+    (N/A if scoring failed) and, when available, the raw VADER "scores".
+    The local engine scores every text in process; its results are not
+    cached, as scoring costs less than a cache lookup.
+    """
+    if _use_local_engine():
+        return local_analyzer.score_many(texts)
+    cached, missing = _split_cached(texts)
+    if not missing:
+        return [cached[text] for text in texts]
+
+    request_url = f"{SENTIMENT_ANALYZER_URL}/analyze/batch"
+    scored = []
+    for batch in _batches(missing):
+        try:
+            response = http_client.post(request_url, json={"texts": batch})
+        except requests.exceptions.RequestException as exc:
+            logger.warning("Sentiment batch failed error=%s", exc)
+            response = None
+        scored.extend(_batch_results(batch, response))
+    return _merge_scored(texts, cached, missing, scored)
+
+
+def unscored_texts(reviews):
+    """
+    Return the texts of the reviews that have no stored sentiment label.
+    """
+    return [
+        review.get("review", "")
+        for review in reviews
+        if not review.get("sentiment")
+    ]
+
+
+def with_sentiments(reviews, sentiments):
+    """
+    Return copies of reviews with each one's sentiment label attached.
+
+    Reviews scored when they were written keep their stored label;
+    sentiments holds the results for the others (see unscored_texts), in
+    order. Copies are made because cached and coalesced responses are
+    shared.
+    """
+    results = iter(sentiments)
+    return [
+        {
+            **review,
+            "sentiment": (
+                review.get("sentiment")
+                or next(results).get("sentiment", "N/A")
+            ),
+        }
+        for review in reviews
+    ]
+
+
+def _stored_sentiment(result):
+    """
+    Return the review fields to store for a sentiment result, or {} when
+    scoring failed.
+    """
+    label = result.get("sentiment")
+    if label in (None, "N/A"):
+        return {}
+    return {
+        "sentiment": label,
+        "sentiment_score": result.get("scores", {}).get("compound"),
+    }
+
+
+def score_reviews(reviews):
+    """
+    Return copies of reviews carrying a sentiment label and compound
+    score, to be stored with them.
+
+    Reviews without a label are scored in one batch call. Those whose
+    scoring failed are returned unlabelled, for backfill_review_sentiments
+    to score later.
+    """
+    results = iter(analyze_review_sentiments_batch(unscored_texts(reviews)))
+    return [
+        review
+        if review.get("sentiment")
+        else {**review, **_stored_sentiment(next(results))}
+        for review in reviews
+    ]
+
+
 def post_review(data_dict):
     """
     Post a review to the backend microservice.
     """
+    review, _ = submit_review(data_dict)
+    return review
+
+
+def submit_review(data_dict):
+    """
+    Post a review to the backend and report how it went.
+
+    Returns (review, retryable): review is the stored review on success,
+    otherwise None, and retryable tells whether a later attempt may
+    succeed (network errors and 5xx) or not (4xx).
+    """
     request_url = f"{BACKEND_URL}/insert_review"
-    print(f"POST to {request_url} with data: {data_dict}")
+    logger.info(
+        "Posting review dealership=%s idempotency_key=%s",
+        data_dict.get("dealership"),
+        data_dict.get("idempotency_key"),
+    )
     try:
-        response = requests.post(request_url, json=data_dict, timeout=10)
+        response = http_client.post(request_url, json=data_dict)
     except requests.exceptions.RequestException as exc:
-        print(f"Network error during POST: {exc}")
-        return None
+        logger.warning("Posting review failed error=%s", exc)
+        return None, True
+
+    if response.status_code in (200, 201):
+        result = response.json()
+        _reviews_stored([data_dict], [result] if isinstance(result, dict) else [])
+        return result, False
+
+    logger.warning("Posting review failed status=%s", response.status_code)
+    return None, response.status_code >= 500
+
+
+def submit_reviews(reviews):
+    """
+    Post a batch of reviews to the backend in one request.
+
+    Returns (stored, retryable) like submit_review; stored holds the stored
+    reviews in the order they were sent.
+    """
+    request_url = f"{BACKEND_URL}/insert_reviews"
+    logger.info("Posting review batch size=%s", len(reviews))
+    try:
+        response = http_client.post(request_url, json=reviews)
+    except requests.exceptions.RequestException as exc:
+        logger.warning("Posting review batch failed error=%s", exc)
+        return None, True
 
     if response.status_code in (200, 201):
+        stored = response.json()
+        if isinstance(stored, list) and len(stored) == len(reviews):
+            _reviews_stored(reviews, stored)
+            return stored, False
+        logger.warning(
+            "Review batch returned the wrong number of reviews size=%s",
+            len(reviews),
+        )
+        return None, True
+
+    logger.warning(
+        "Posting review batch failed status=%s",
+        response.status_code,
+    )
+    return None, response.status_code >= 500
+
+
+def update_review_sentiments(reviews):
+    """
+    Store the sentiment label and compound score of reviews the backend
+    already holds.
+
+    reviews are full review records carrying the new fields. Returns True
+    on success.
+    """
+    request_url = f"{BACKEND_URL}/update_sentiments"
+    updates = [
+        {
+            "id": review["id"],
+            "sentiment": review["sentiment"],
+            "sentiment_score": review.get("sentiment_score"),
+        }
+        for review in reviews
+    ]
+    logger.info("Updating review sentiments size=%s", len(updates))
+    try:
+        response = http_client.post(request_url, json=updates)
+    except requests.exceptions.RequestException as exc:
+        logger.warning("Updating review sentiments failed error=%s", exc)
+        return False
+
+    if response.status_code == 200:
+        _reviews_stored(reviews, reviews)
+        return True
+
+    logger.warning(
+        "Updating review sentiments failed status=%s",
+        response.status_code,
+    )
+    return False
+
+
+def _reviews_stored(posted, stored):
+    """
+    Drop cached reviews of the dealers that received posted reviews, and
+    write the stored reviews through to the replica.
+    """
+    for dealership in {str(review.get("dealership")) for review in posted}:
+        response_cache.invalidate(("reviews", dealership))
+    # Write through so the replica shows the reviews before the next sync.
+    if _use_replica() and stored:
+        replica.upsert_reviews(stored)
+
+
+# -------------------------------------------------------------
+# ASYNC PROXY FUNCTIONS (used by the async views)
+# -------------------------------------------------------------
+
+
+async def async_get_request(endpoint, **kwargs):
+    """
+    Async variant of get_request; identical concurrent requests on the same
+    event loop share one upstream call.
+    """
+    key = (endpoint, tuple(sorted(kwargs.items())))
+    return await async_inflight_requests.do(
+        key,
+        lambda: _async_get_backend(endpoint, kwargs),
+    )
+
+
+async def _async_get_backend(endpoint, params):
+    """
+    Send one async GET to the backend service and parse the JSON response.
+    """
+    request_url = f"{BACKEND_URL}{endpoint}"
+    logger.debug("Backend async GET endpoint=%s params=%s", endpoint, params)
+
+    try:
+        response = await async_http_client.get(
+            request_url,
+            params=params,
+            endpoint=_endpoint_label(endpoint),
+        )
+    except httpx.HTTPError as exc:
+        logger.warning("Backend GET failed endpoint=%s error=%s", endpoint, exc)
+        return None
+
+    if response.status_code == 200:
         return response.json()
 
-    print(f"Post review failed with status: {response.status_code}")
+    logger.warning(
+        "Backend GET failed endpoint=%s status=%s",
+        endpoint,
+        response.status_code,
+    )
     return None
+
+
+async def async_get_dealers(state=None):
+    """
+    Async variant of get_dealers.
+    """
+    if _use_replica():
+        return await sync_to_async(replica.get_dealers)(state)
+
+    async def load():
+        return _unwrap_dealers(
+            await async_get_request(_dealers_endpoint(state)),
+        )
+
+    return await _cached_async(
+        ("dealers", state or ""),
+        DEALERS_CACHE_TTL,
+        lambda: _fetch_dealers(state),
+        load,
+    )
+
+
+async def async_get_dealer_details(dealer_id):
+    """
+    Async variant of get_dealer_details.
+    """
+    if _use_replica():
+        return await sync_to_async(replica.get_dealer_details)(dealer_id)
+    endpoint = f"/fetchDealer/{dealer_id}"
+
+    async def load():
+        return await async_get_request(endpoint) or None
+
+    return await _cached_async(
+        ("dealer", str(dealer_id)),
+        DEALER_CACHE_TTL,
+        lambda: get_request(endpoint) or None,
+        load,
+    )
+
+
+async def async_get_reviews_for_dealer(dealer_id):
+    """
+    Async variant of get_reviews_for_dealer.
+    """
+    if _use_replica():
+        return await sync_to_async(replica.get_reviews_for_dealer)(dealer_id)
+    endpoint = f"/fetchReviews/dealer/{dealer_id}"
+
+    async def load():
+        return await async_get_request(endpoint) or None
+
+    return await _cached_async(
+        ("reviews", str(dealer_id)),
+        REVIEWS_CACHE_TTL,
+        lambda: get_request(endpoint) or None,
+        load,
+    )
+
+
+async def async_analyze_review_sentiments_batch(texts):
+    """
+    Async variant of analyze_review_sentiments_batch.
+    """
+    if _use_local_engine():
+        return local_analyzer.score_many(texts)
+    cached, missing = _split_cached(texts)
+    if not missing:
+        return [cached[text] for text in texts]
+
+    request_url = f"{SENTIMENT_ANALYZER_URL}/analyze/batch"
+    scored = []
+    for batch in _batches(missing):
+        try:
+            response = await async_http_client.post(
+                request_url,
+                json={"texts": batch},
+            )
+        except httpx.HTTPError as exc:
+            logger.warning("Sentiment batch failed error=%s", exc)
+            response = None
+        scored.extend(_batch_results(batch, response))
+    return _merge_scored(texts, cached, missing, scored)
+
+
+async def async_get_reviews_with_sentiments(dealer_id):
+    """
+    Async variant of get_reviews_with_sentiments.
+    """
+    reviews = await async_get_reviews_for_dealer(dealer_id) or []
+    sentiments = await async_analyze_review_sentiments_batch(
+        unscored_texts(reviews),
+    )
+    return with_sentiments(reviews, sentiments)
+
+
+def get_pool_stats():
+    """
+    Return connection pool statistics for every upstream host.
+    """
+    return http_client.stats()
+
+
+def get_circuit_stats():
+    """
+    Return circuit breaker state and failure rate for every upstream host.
+    """
+    return circuit_breakers.stats()
+
+
+def get_cache_stats():
+    """
+    Return hit/miss/eviction counters for the response cache, plus how many
+    upstream reads were coalesced into in-flight calls.
+    """
+    return {
+        **response_cache.stats(),
+        "single_flight": inflight_requests.stats(),
+        "async_single_flight": async_inflight_requests.stats(),
+        "sentiment": sentiment_cache.stats(),
+    }
+
+
+def _ratio(hits, total):
+    """
+    Return hits / total, or 0 when there were no lookups.
+    """
+    return hits / total if total else 0.0
+
+
+def _collect_metrics():
+    """
+    Return cache, single-flight, circuit breaker and connection pool
+    figures as metric families for /metrics.
+    """
+    cache = response_cache.stats()
+    served = cache["hits"] + cache["stale_hits"]
+    sentiment = sentiment_cache.stats()
+    flights = inflight_requests.stats()
+    circuits = circuit_breakers.stats()
+    pools = http_client.stats()
+    return [
+        (
+            "response_cache_requests_total",
+            "counter",
+            "Response cache lookups by result.",
+            [
+                ({"result": "hit"}, cache["hits"]),
+                ({"result": "stale_hit"}, cache["stale_hits"]),
+                ({"result": "miss"}, cache["misses"]),
+            ],
+        ),
+        (
+            "response_cache_hit_ratio",
+            "gauge",
+            "Share of response cache lookups served from the cache.",
+            [({}, _ratio(served, served + cache["misses"]))],
+        ),
+        (
+            "response_cache_evictions_total",
+            "counter",
+            "Response cache entries evicted to stay within max_entries.",
+            [({}, cache["evictions"])],
+        ),
+        (
+            "response_cache_entries",
+            "gauge",
+            "Entries in the response cache.",
+            [({}, cache["size"])],
+        ),
+        (
+            "sentiment_cache_requests_total",
+            "counter",
+            "Sentiment cache lookups by result.",
+            [
+                ({"result": "hit"}, sentiment["hits"]),
+                ({"result": "miss"}, sentiment["misses"]),
+            ],
+        ),
+        (
+            "sentiment_cache_hit_ratio",
+            "gauge",
+            "Share of sentiment cache lookups served from the cache.",
+            [
+                (
+                    {},
+                    _ratio(
+                        sentiment["hits"],
+                        sentiment["hits"] + sentiment["misses"],
+                    ),
+                ),
+            ],
+        ),
+        (
+            "single_flight_calls_total",
+            "counter",
+            "Backend GETs executed, and those coalesced into one in flight.",
+            [
+                ({"result": "executed"}, flights["calls"]),
+                ({"result": "coalesced"}, flights["coalesced"]),
+            ],
+        ),
+        (
+            "upstream_circuit_state",
+            "gauge",
+            "1 for the current circuit breaker state of each upstream.",
+            [
+                ({"upstream": host, "state": state}, int(stats["state"] == state))
+                for host, stats in circuits.items()
+                for state in ("closed", "open", "half_open")
+            ],
+        ),
+        (
+            "upstream_circuit_failure_rate",
+            "gauge",
+            "Failure rate over the circuit breaker window.",
+            [
+                ({"upstream": host}, stats["failure_rate"])
+                for host, stats in circuits.items()
+            ],
+        ),
+        (
+            "upstream_circuit_rejected_total",
+            "counter",
+            "Calls failed fast because the circuit was open.",
+            [
+                ({"upstream": host}, stats["rejected"])
+                for host, stats in circuits.items()
+            ],
+        ),
+        (
+            "upstream_pool_connections_opened_total",
+            "counter",
+            "Connections opened by the upstream connection pools.",
+            [
+                ({"upstream": host}, stats["connections_opened"])
+                for host, stats in pools.items()
+            ],
+        ),
+    ]
+
+
+register_collector(_collect_metrics)
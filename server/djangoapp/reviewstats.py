@@ -0,0 +1,171 @@
+"""
+Per-dealer review aggregates: counts, sentiment mix and purchase rate.
+
+Each accepted review is folded into its dealer's DealerReviewStats row by
+record_review, so dealer ratings can be read without fetching and scoring
+every review. rebuild_stats recomputes every row from scratch.
+"""
+
+import logging
+from collections import Counter
+
+from django.db import transaction
+
+from .models import DealerReviewStats
+from .restapis import (
+    analyze_review_sentiments_batch,
+    unscored_texts,
+    with_sentiments,
+)
+
+logger = logging.getLogger(__name__)
+
+TOP_COUNTS = 5
+# Sentiment labels with their own counter; anything else (e.g. N/A when
+# scoring failed) is counted as unscored.
+SCORED_LABELS = ("positive", "neutral", "negative")
+
+
+def _add_review(stats, review, sentiment):
+    """
+    Fold one review and its sentiment label into an unsaved stats row.
+    """
+    stats.review_count += 1
+    field = sentiment if sentiment in SCORED_LABELS else "unscored"
+    setattr(stats, field, getattr(stats, field) + 1)
+    if review.get("purchase"):
+        stats.purchases += 1
+
+    make = review.get("car_make")
+    if make:
+        stats.make_counts[make] = stats.make_counts.get(make, 0) + 1
+    year = review.get("car_year")
+    if year:
+        # JSON object keys are strings.
+        year = str(year)
+        stats.year_counts[year] = stats.year_counts.get(year, 0) + 1
+
+    scored = stats.positive + stats.neutral + stats.negative
+    if scored:
+        stats.rating = (stats.positive + stats.neutral / 2) / scored
+
+
+def _dealer_id(review):
+    """
+    Return the dealer id of a review as an int, or None.
+    """
+    try:
+        return int(review.get("dealership"))
+    except (TypeError, ValueError):
+        return None
+
+
+def record_review(review, sentiment):
+    """
+    Add one newly posted review to its dealer's aggregates.
+    """
+    dealer_id = _dealer_id(review)
+    if dealer_id is None:
+        return
+    with transaction.atomic():
+        stats, _ = DealerReviewStats.objects.select_for_update().get_or_create(
+            dealer_id=dealer_id,
+        )
+        _add_review(stats, review, sentiment)
+        stats.save()
+
+
+def record_posted_reviews(reviews):
+    """
+    Add reviews the backend newly stored to the aggregates, scoring any
+    stored without a sentiment label in one batch.
+
+    Reviews the backend reports as already stored ("created": false, a
+    redelivered idempotency key) were counted when first stored and are
+    skipped. Failures are logged rather than raised: the reviews are
+    already stored, and rebuild_review_stats recomputes the aggregates.
+    """
+    reviews = [review for review in reviews if review.get("created", True)]
+    try:
+        sentiments = analyze_review_sentiments_batch(unscored_texts(reviews))
+        for review in with_sentiments(reviews, sentiments):
+            record_review(review, review["sentiment"])
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error("Error updating review stats: %s", exc)
+
+
+def rebuild_stats(reviews, sentiments):
+    """
+    Replace every dealer's aggregates with ones computed from reviews.
+
+    sentiments holds one label per review, in order. Returns the number
+    of dealers with stats.
+    """
+    rows = {}
+    for review, sentiment in zip(reviews, sentiments):
+        dealer_id = _dealer_id(review)
+        if dealer_id is None:
+            continue
+        if dealer_id not in rows:
+            rows[dealer_id] = DealerReviewStats(dealer_id=dealer_id)
+        _add_review(rows[dealer_id], review, sentiment)
+
+    with transaction.atomic():
+        DealerReviewStats.objects.all().delete()
+        DealerReviewStats.objects.bulk_create(rows.values())
+    return len(rows)
+
+
+def _top(counts):
+    """
+    Return the most common entries of a {key: count} map as pairs.
+    """
+    return [list(pair) for pair in Counter(counts).most_common(TOP_COUNTS)]
+
+
+def serialize_stats(stats):
+    """
+    Return the JSON representation of a DealerReviewStats row.
+    """
+    return {
+        "dealer_id": stats.dealer_id,
+        "review_count": stats.review_count,
+        "sentiments": {
+            "positive": stats.positive,
+            "neutral": stats.neutral,
+            "negative": stats.negative,
+            "unknown": stats.unscored,
+        },
+        "purchase_ratio": (
+            stats.purchases / stats.review_count
+            if stats.review_count
+            else None
+        ),
+        "rating": stats.rating,
+        "top_makes": _top(stats.make_counts),
+        "top_years": _top(stats.year_counts),
+    }
+
+
+def dealer_stats(dealer_id):
+    """
+    Return the serialized aggregates for one dealer.
+
+    Dealers without any recorded review get all-zero stats.
+    """
+    stats = DealerReviewStats.objects.filter(dealer_id=dealer_id).first()
+    if stats is None:
+        stats = DealerReviewStats(dealer_id=dealer_id)
+    return serialize_stats(stats)
+
+
+def stats_by_dealer(dealer_ids):
+    """
+    Return {dealer id: serialized aggregates} for dealers with stats.
+    """
+    return {
+        stats.dealer_id: serialize_stats(stats)
+        for stats in DealerReviewStats.objects.filter(
+            dealer_id__in=dealer_ids,
+        )
+    }
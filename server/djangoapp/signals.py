@@ -0,0 +1,23 @@
+"""
+Signal handlers keeping derived data in sync with model writes.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import invalidate_catalog
+from .models import CarMake, CarModel
+
+
+@receiver(post_save, sender=CarMake)
+@receiver(post_delete, sender=CarMake)
+@receiver(post_save, sender=CarModel)
+@receiver(post_delete, sender=CarModel)
+def invalidate_catalog_cache(sender, **kwargs):
+    """
+    Drop cached get_cars responses when the catalog changes.
+
+    Deferred until commit so no request re-caches the old rows meanwhile.
+    """
+    transaction.on_commit(invalidate_catalog)
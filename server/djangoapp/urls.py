@@ -45,16 +45,68 @@ urlpatterns = [
         view=views.get_dealer_reviews,
         name="dealer_reviews",
     ),
+    path(
+        route="dealer/<int:dealer_id>/page",
+        view=views.get_dealer_page,
+        name="dealer_page",
+    ),
+    path(
+        route="dealer/<int:dealer_id>/stats",
+        view=views.get_dealer_stats,
+        name="dealer_stats",
+    ),
+    # Async (ASGI) variants of the proxy paths
+    path(
+        route="async/get_dealers",
+        view=views.get_dealers_list_async,
+        name="get_dealers_list_async",
+    ),
+    path(
+        route="async/get_dealers/<str:state>",
+        view=views.get_dealers_list_async,
+        name="get_dealers_by_state_async",
+    ),
+    path(
+        route="async/dealer/<int:dealer_id>",
+        view=views.get_dealer_details_async,
+        name="dealer_details_async",
+    ),
+    path(
+        route="async/reviews/dealer/<int:dealer_id>",
+        view=views.get_dealer_reviews_async,
+        name="dealer_reviews_async",
+    ),
     # Add review path
     path(
         route="add_review",
         view=views.add_review,
         name="add_review",
     ),
+    path(
+        route="add_reviews",
+        view=views.add_reviews,
+        name="add_reviews",
+    ),
+    path(
+        route="review_submission/<str:submission_id>",
+        view=views.get_review_submission,
+        name="review_submission",
+    ),
+    # Upstream monitoring
+    path(
+        route="upstream_stats",
+        view=views.upstream_stats,
+        name="upstream_stats",
+    ),
     # Local car data
     path(
         route="get_cars",
         view=views.get_cars,
         name="get_cars",
     ),
+    path(
+        route="inventory/<int:dealer_id>",
+        view=views.get_dealer_inventory,
+        name="dealer_inventory",
+    ),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
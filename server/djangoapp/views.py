@@ -1,24 +1,51 @@
 # --- Python Standard Library Imports ---
 import json
 import logging
+from collections import Counter
 
 # --- Django Imports (Third-Party) ---
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.views.decorators.csrf import csrf_exempt
 
 # --- Local Imports ---
-from .models import CarMake, CarModel
+from .catalog import (
+    QueryParamError,
+    cached_catalog,
+    decode_cursor,
+    encode_cursor,
+    inventory_page,
+    parse_catalog_query,
+    parse_inventory_query,
+)
+from .httpclient import closes_async_client
+from .metrics import render as render_metrics
+from .models import ReviewSubmission
+from .outbox import enqueue_review, enqueue_reviews, serialize_submission
+from .replica import DEALERSHIP_FIELDS
+from .reviewstats import dealer_stats, stats_by_dealer
+from .restapis import (
+    async_get_dealer_details,
+    async_get_dealers,
+    async_get_reviews_with_sentiments,
+)
 from .restapis import (
     get_dealer_details as get_dealer_details_from_api,
 )
 from .restapis import (
+    get_cache_stats,
+    get_circuit_stats,
     get_dealers,
+    get_dealer_with_reviews,
+    get_dealers_page,
+    get_pool_stats,
     get_reviews_for_dealer,
-    post_review,
 )
 
 logger = logging.getLogger(__name__)
@@ -157,6 +184,52 @@ def registration(request):
 # --- PROXY SERVICE VIEWS ---
 
 
+DEALER_LIST_PARAMS = ("state", "city", "zip", "cursor", "limit", "fields")
+DEALERS_DEFAULT_LIMIT = 50
+DEALERS_MAX_LIMIT = 500
+
+
+def _parse_dealer_list_query(params, state):
+    """
+    Validate paginated dealer list query parameters.
+
+    Raises QueryParamError with a client-facing message when invalid.
+    """
+    try:
+        limit = int(params.get("limit") or DEALERS_DEFAULT_LIMIT)
+    except ValueError as exc:
+        raise QueryParamError("'limit' must be an integer.") from exc
+    if not 1 <= limit <= DEALERS_MAX_LIMIT:
+        raise QueryParamError(
+            f"'limit' must be between 1 and {DEALERS_MAX_LIMIT}.",
+        )
+
+    after = None
+    if params.get("cursor"):
+        cursor = decode_cursor(params["cursor"])
+        if len(cursor) != 1 or not isinstance(cursor[0], int):
+            raise QueryParamError("'cursor' is invalid.")
+        after = cursor[0]
+
+    fields = None
+    if params.get("fields"):
+        fields = params["fields"].split(",")
+        unknown = set(fields) - set(DEALERSHIP_FIELDS)
+        if unknown:
+            raise QueryParamError(
+                f"Unknown fields: {', '.join(sorted(unknown))}.",
+            )
+
+    return {
+        "state": params.get("state") or state,
+        "city": params.get("city"),
+        "zip_prefix": params.get("zip"),
+        "after": after,
+        "limit": limit,
+        "fields": fields,
+    }
+
+
 def get_dealers_list(request, state=None):
     """
     Return the list of dealers, optionally filtered by state.
@@ -164,13 +237,47 @@ def get_dealers_list(request, state=None):
     URL patterns:
     - /get_dealers
     - /get_dealers/<state>
+
+    Without query parameters the full list is returned. With any of the
+    following, one page is returned and filtering, pagination and field
+    projection happen in the backend:
+    - state, city: exact match; zip: zip code prefix
+    - limit: page size (default 50, max 500)
+    - cursor: next_cursor from the previous page
+    - fields: comma-separated dealer fields to return
+
+    Either way, stats=1 attaches each dealer's review aggregates.
+    sort=rating orders the full list by rating, best first; pages are
+    keyed by dealer id, so it cannot be combined with the page parameters
+    (use /get_dealers/<state>?sort=rating to rank one state).
     """
+    sort = request.GET.get("sort")
+    if sort not in (None, "", "id", "rating"):
+        return JsonResponse(
+            {"status": 400, "message": "'sort' must be id or rating."},
+            status=400,
+        )
+
+    if any(name in request.GET for name in DEALER_LIST_PARAMS):
+        if sort == "rating":
+            return JsonResponse(
+                {
+                    "status": 400,
+                    "message": (
+                        "sort=rating cannot be combined with "
+                        f"{', '.join(DEALER_LIST_PARAMS)}."
+                    ),
+                },
+                status=400,
+            )
+        return _get_dealers_page(request, state)
+
     dealerships = get_dealers(state=state)
     if dealerships:
         return JsonResponse(
             {
                 "status": 200,
-                "dealers": dealerships,
+                "dealers": _with_review_stats(request, dealerships),
             },
             status=200,
         )
@@ -184,6 +291,78 @@ def get_dealers_list(request, state=None):
     )
 
 
+def _with_review_stats(request, dealerships):
+    """
+    Attach review aggregates, and apply sort=rating to the full dealer
+    list, for get_dealers_list.
+
+    Dealers are copied, since cached responses are shared.
+    """
+    sort_by_rating = request.GET.get("sort") == "rating"
+    if request.GET.get("stats") not in ("1", "true") and not sort_by_rating:
+        return dealerships
+
+    stats = stats_by_dealer([dealer["id"] for dealer in dealerships])
+    dealerships = [
+        {**dealer, "stats": stats.get(dealer["id"])}
+        for dealer in dealerships
+    ]
+    if sort_by_rating:
+        dealerships.sort(key=_rating_sort_key)
+    return dealerships
+
+
+def _rating_sort_key(dealer):
+    """
+    Order dealers by rating, best first, then by review count; unrated
+    dealers go last.
+    """
+    stats = dealer["stats"] or {}
+    rating = stats.get("rating")
+    return (
+        rating is None,
+        -(rating or 0),
+        -stats.get("review_count", 0),
+        dealer["id"],
+    )
+
+
+def _get_dealers_page(request, state):
+    """
+    Return one keyset-paginated page of dealers for get_dealers_list.
+    """
+    try:
+        query = _parse_dealer_list_query(request.GET, state)
+    except QueryParamError as exc:
+        return JsonResponse({"status": 400, "message": str(exc)}, status=400)
+
+    # Ask for one extra dealer to learn whether another page exists.
+    limit = query["limit"]
+    dealerships = get_dealers_page(**{**query, "limit": limit + 1})
+    if dealerships is None:
+        return JsonResponse(
+            {
+                "status": 404,
+                "message": "Could not fetch dealer list from API.",
+            },
+            status=404,
+        )
+
+    next_cursor = None
+    if len(dealerships) > limit:
+        dealerships = dealerships[:limit]
+        next_cursor = encode_cursor([dealerships[-1]["id"]])
+
+    return JsonResponse(
+        {
+            "status": 200,
+            "dealers": _with_review_stats(request, dealerships),
+            "next_cursor": next_cursor,
+        },
+        status=200,
+    )
+
+
 def get_dealer_details(request, dealer_id):
     """
     Return details for a given dealer.
@@ -255,12 +434,65 @@ def get_dealer_reviews(request, dealer_id):
     )
 
 
+def _review_summary(reviews):
+    """
+    Return review count and sentiment distribution for a dealer page.
+    """
+    sentiments = Counter(review.get("sentiment", "N/A") for review in reviews)
+    return {
+        "count": len(reviews),
+        "sentiments": {
+            "positive": sentiments["positive"],
+            "neutral": sentiments["neutral"],
+            "negative": sentiments["negative"],
+            "unknown": sentiments["N/A"],
+        },
+    }
+
+
+def get_dealer_page(request, dealer_id):
+    """
+    Return everything the dealer page needs in one response: dealer
+    details, reviews with sentiment labels and review summary stats.
+
+    Dealer details and reviews are fetched concurrently through the pooled
+    client. Reviews carry the sentiment label stored when they were
+    written; any without one are scored in one batch sentiment call.
+
+    URL pattern:
+    - /dealer/<dealer_id>/page
+    """
+    dealer, reviews = get_dealer_with_reviews(dealer_id)
+    if not dealer:
+        return JsonResponse(
+            {
+                "status": 404,
+                "message": f"Dealer with ID {dealer_id} not found.",
+            },
+            status=404,
+        )
+
+    return JsonResponse(
+        {
+            "status": 200,
+            "dealer": dealer,
+            "reviews": reviews,
+            "summary": _review_summary(reviews),
+        },
+        status=200,
+    )
+
+
 @csrf_exempt
 def add_review(request):
     """
-    Add a review for a dealer via backend microservice.
+    Accept a review for a dealer and queue it for the backend.
 
-    Requires authentication.
+    Requires authentication. The review is stored in the local outbox and
+    acknowledged with 202 straight away; it is posted to the backend in
+    the background, with retries while the backend is unavailable. Track
+    it at the returned status_url. Clients may send an Idempotency-Key
+    header so a retried submission is queued only once.
     """
     if not request.user.is_authenticated:
         return JsonResponse(
@@ -279,36 +511,337 @@ def add_review(request):
             status=400,
         )
 
+    idempotency_key = request.headers.get("Idempotency-Key")
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= 64:
+        return JsonResponse(
+            {
+                "status": 400,
+                "message": "Idempotency-Key must be 1 to 64 characters.",
+            },
+            status=400,
+        )
+
     # Safely set reviewer's name from authenticated user.
     data["name"] = request.user.username
 
     try:
-        response = post_review(data)
+        submission, _ = enqueue_review(
+            data,
+            request.user.username,
+            idempotency_key,
+        )
     except Exception as exc:  # pylint: disable=broad-except
-        logger.error("Error posting review: %s", exc)
+        logger.error("Error queueing review: %s", exc)
         return JsonResponse(
             {
                 "status": 500,
-                "message": "Failed to submit review to external API.",
+                "message": "Failed to submit review.",
             },
             status=500,
         )
 
-    if response:
+    return JsonResponse(
+        {
+            "status": 202,
+            "message": "Review accepted for submission.",
+            "submission_id": submission.idempotency_key,
+            "status_url": reverse(
+                "review_submission",
+                args=[submission.idempotency_key],
+            ),
+        },
+        status=202,
+    )
+
+
+ADD_REVIEWS_MAX_BATCH = 1000
+# field -> JSON type required in reviews sent to add_reviews
+REVIEW_FIELD_TYPES = {
+    "dealership": int,
+    "review": str,
+    "purchase": bool,
+    "purchase_date": str,
+    "car_make": str,
+    "car_model": str,
+    "car_year": int,
+}
+
+
+def _review_error(item, user):
+    """
+    Return why one add_reviews item is invalid, or None if it is valid.
+    """
+    if not isinstance(item, dict):
+        return "Each review must be a JSON object."
+    for field, field_type in REVIEW_FIELD_TYPES.items():
+        value = item.get(field)
+        # bool is an int subclass, so check it separately.
+        is_bool = isinstance(value, bool)
+        if not isinstance(value, field_type) or is_bool != (field_type is bool):
+            return f"'{field}' is missing or has the wrong type."
+    if not item["review"].strip():
+        return "'review' must not be empty."
+    if "name" in item and item["name"] != user.username and not user.is_staff:
+        return "'name' must be the authenticated user."
+    key = item.get("idempotency_key")
+    if key is not None and not (isinstance(key, str) and 0 < len(key) <= 64):
+        return "'idempotency_key' must be 1 to 64 characters."
+    return None
+
+
+@csrf_exempt
+def add_reviews(request):
+    """
+    Accept a batch of reviews (a JSON array) and queue them for the backend.
+
+    Requires authentication. Every review is validated first and nothing
+    is queued unless all are valid. Reviews are posted under the
+    authenticated user's name; staff accounts importing reviews from
+    partners may set "name" themselves. Each review may carry an
+    "idempotency_key" so re-sending a batch queues nothing twice.
+
+    Queued reviews are delivered to the backend in batches, so importing
+    many reviews costs one backend round trip per batch.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {
+                "status": 403,
+                "message": "Login required to post reviews.",
+            },
+            status=403,
+        )
+
+    try:
+        items = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse(
+            {"status": 400, "message": "Invalid JSON format."},
+            status=400,
+        )
+    if not isinstance(items, list) or not items:
+        return JsonResponse(
+            {"status": 400, "message": "Expected a JSON array of reviews."},
+            status=400,
+        )
+    if len(items) > ADD_REVIEWS_MAX_BATCH:
+        return JsonResponse(
+            {
+                "status": 413,
+                "message": f"At most {ADD_REVIEWS_MAX_BATCH} reviews "
+                "per request.",
+            },
+            status=413,
+        )
+
+    errors = [
+        {"index": index, "message": error}
+        for index, error in enumerate(
+            _review_error(item, request.user) for item in items
+        )
+        if error
+    ]
+    if errors:
+        return JsonResponse(
+            {
+                "status": 400,
+                "message": "Invalid reviews; nothing was queued.",
+                "errors": errors,
+            },
+            status=400,
+        )
+
+    reviews = []
+    for item in items:
+        data = {field: item[field] for field in REVIEW_FIELD_TYPES}
+        data["name"] = item.get("name", request.user.username)
+        reviews.append((data, item.get("idempotency_key")))
+
+    try:
+        submissions = enqueue_reviews(reviews, request.user.username)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error("Error queueing reviews: %s", exc)
+        return JsonResponse(
+            {
+                "status": 500,
+                "message": "Failed to submit reviews.",
+            },
+            status=500,
+        )
+
+    return JsonResponse(
+        {
+            "status": 202,
+            "message": f"{len(submissions)} reviews accepted for submission.",
+            "submission_ids": [
+                submission.idempotency_key for submission in submissions
+            ],
+        },
+        status=202,
+    )
+
+
+def get_review_submission(request, submission_id):
+    """
+    Return the delivery state of a review queued by add_review:
+    pending, sent (with the backend review_id) or failed.
+
+    Only the user who submitted the review can see it.
+
+    URL pattern:
+    - /review_submission/<submission_id>
+    """
+    submission = None
+    if request.user.is_authenticated:
+        submission = ReviewSubmission.objects.filter(
+            idempotency_key=submission_id,
+            username=request.user.username,
+        ).first()
+    if submission is None:
+        return JsonResponse(
+            {
+                "status": 404,
+                "message": f"Review submission {submission_id} not found.",
+            },
+            status=404,
+        )
+
+    return JsonResponse(
+        {
+            "status": 200,
+            "submission": serialize_submission(submission),
+        },
+        status=200,
+    )
+
+
+def get_dealer_stats(request, dealer_id):
+    """
+    Return precomputed review aggregates for a dealer: review count,
+    sentiment mix, purchase ratio, rating and most-reviewed makes/years.
+
+    URL pattern:
+    - /dealer/<dealer_id>/stats
+    """
+    return JsonResponse(
+        {
+            "status": 200,
+            "stats": dealer_stats(dealer_id),
+        },
+        status=200,
+    )
+
+
+# --- ASYNC PROXY SERVICE VIEWS ---
+# Non-blocking variants of the proxy views for ASGI deployments, e.g.
+# gunicorn djangoproj.asgi:application -k uvicorn.workers.UvicornWorker
+
+
+@closes_async_client
+async def get_dealers_list_async(request, state=None):
+    """
+    Async variant of get_dealers_list.
+
+    URL patterns:
+    - /async/get_dealers
+    - /async/get_dealers/<state>
+    """
+    dealerships = await async_get_dealers(state=state)
+    if dealerships:
+        return JsonResponse(
+            {
+                "status": 200,
+                "dealers": dealerships,
+            },
+            status=200,
+        )
+
+    return JsonResponse(
+        {
+            "status": 404,
+            "message": "Could not fetch dealer list from API.",
+        },
+        status=404,
+    )
+
+
+@closes_async_client
+async def get_dealer_details_async(request, dealer_id):
+    """
+    Async variant of get_dealer_details.
+
+    URL pattern:
+    - /async/dealer/<dealer_id>
+    """
+    dealer_details = await async_get_dealer_details(dealer_id)
+    if dealer_details:
         return JsonResponse(
             {
                 "status": 200,
-                "message": "Review submitted successfully.",
+                "dealer": dealer_details,
             },
             status=200,
         )
 
     return JsonResponse(
         {
-            "status": 500,
-            "message": "Failed to submit review to external API.",
+            "status": 404,
+            "message": f"Dealer with ID {dealer_id} not found.",
         },
-        status=500,
+        status=404,
+    )
+
+
+@closes_async_client
+async def get_dealer_reviews_async(request, dealer_id):
+    """
+    Async variant of get_dealer_reviews; each review also carries its
+    sentiment label (stored when it was written, or scored in one batch
+    call for reviews written before).
+
+    URL pattern:
+    - /async/reviews/dealer/<dealer_id>
+    """
+    reviews = await async_get_reviews_with_sentiments(dealer_id)
+    return JsonResponse(
+        {
+            "status": 200,
+            "reviews": reviews,
+        },
+        status=200,
+    )
+
+
+def upstream_stats(request):
+    """
+    Return connection pool, circuit breaker and response cache statistics
+    for the upstream services.
+
+    URL pattern:
+    - /upstream_stats
+    """
+    return JsonResponse(
+        {
+            "status": 200,
+            "pools": get_pool_stats(),
+            "circuits": get_circuit_stats(),
+            "cache": get_cache_stats(),
+        },
+        status=200,
+    )
+
+
+def metrics(request):
+    """
+    Export request, upstream, cache and circuit breaker metrics in the
+    Prometheus text format.
+
+    URL pattern:
+    - /metrics
+    """
+    return HttpResponse(
+        render_metrics(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
     )
 
 
@@ -319,6 +852,17 @@ def get_cars(request):
     """
     Fetch CarMake and CarModel data from the local database.
 
+    The catalog is read with two queries however many makes and models
+    exist, serialized once per catalog version and served from the cache
+    with an ETag/Last-Modified; conditional requests get 304 Not Modified.
+
+    Optional query parameters:
+    - make: make name (case-insensitive)
+    - type: car type, e.g. SUV
+    - year_min / year_max: inclusive model year range
+    - dealer_id: only models stocked by this dealer
+    - page / page_size: paginate over makes (page is 1-based)
+
     Response:
     {
         "status": 200,
@@ -339,42 +883,86 @@ def get_cars(request):
                 ]
             },
             ...
-        ]
+        ],
+        "page": <page>,            (only when paginating)
+        "page_size": <page_size>,  (only when paginating)
+        "has_next": <bool>         (only when paginating)
     }
     """
     try:
-        car_makes = CarMake.objects.all()
-        dealer_cars = []
-
-        for car_make in car_makes:
-            models = CarModel.objects.filter(make=car_make)
-            model_data = list(
-                models.values(
-                    "id",
-                    "name",
-                    "car_type",
-                    "year",
-                    "dealer_id",
-                ),
-            )
-            dealer_cars.append(
-                {
-                    "id": car_make.id,
-                    "name": car_make.name,
-                    "description": car_make.description,
-                    "models": model_data,
-                },
-            )
+        query = parse_catalog_query(request.GET)
+    except QueryParamError as exc:
+        return JsonResponse({"status": 400, "message": str(exc)}, status=400)
 
+    try:
+        body, etag, last_modified = cached_catalog(query)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error("Error fetching car data: %s", exc)
         return JsonResponse(
             {
-                "status": 200,
-                "cars": dealer_cars,
+                "status": 500,
+                "message": f"Internal server error: {exc}",
             },
-            status=200,
+            status=500,
         )
+
+    not_modified = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+    if not_modified is not None:
+        return not_modified
+
+    response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def get_dealer_inventory(request, dealer_id):
+    """
+    Return one page of a dealer's car inventory from the local database.
+
+    URL pattern:
+    - /inventory/<dealer_id>
+
+    Optional query parameters:
+    - make, model, body_type: case-insensitive exact matches
+    - year_min / year_max: inclusive model year range
+    - max_mileage: mileage cap
+    - sort: id (default), year, -year, mileage or -mileage
+    - limit: page size (default 50, max 200)
+    - cursor: next_cursor from the previous page
+
+    Response:
+    {
+        "status": 200,
+        "dealer_id": <dealer_id>,
+        "cars": [
+            {
+                "id": <id>,
+                "dealer_id": <dealer_id>,
+                "make": "<make>",
+                "model": "<model>",
+                "bodyType": "<type>",
+                "year": <year>,
+                "mileage": <mileage>
+            },
+            ...
+        ],
+        "next_cursor": "<cursor>" or null
+    }
+    """
+    try:
+        query = parse_inventory_query(request.GET)
+    except QueryParamError as exc:
+        return JsonResponse({"status": 400, "message": str(exc)}, status=400)
+
+    try:
+        cars, next_cursor = inventory_page(dealer_id, query)
     except Exception as exc:  # pylint: disable=broad-except
-        logger.error("Error fetching car data: %s", exc)
+        logger.error("Error fetching inventory: %s", exc)
         return JsonResponse(
             {
                 "status": 500,
@@ -382,3 +970,13 @@ def get_cars(request):
             },
             status=500,
         )
+
+    return JsonResponse(
+        {
+            "status": 200,
+            "dealer_id": dealer_id,
+            "cars": cars,
+            "next_cursor": next_cursor,
+        },
+        status=200,
+    )
@@ -54,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so request timings cover the other middleware too.
+    'djangoapp.middleware.request_metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -142,3 +144,28 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 STATICFILES_DIRS = []
 
+# Structured, leveled logging to the console; set log_level=DEBUG to also
+# log every upstream call.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {
+            'format': '%(asctime)s level=%(levelname)s logger=%(name)s '
+                      '%(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'structured',
+        },
+    },
+    'loggers': {
+        'djangoapp': {
+            'handlers': ['console'],
+            'level': os.environ.get('log_level', 'INFO').upper(),
+            'propagate': False,
+        },
+    },
+}
@@ -25,4 +25,5 @@ urlpatterns = [
     path('', TemplateView.as_view(template_name="Home.html")),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
+    path('metrics', views.metrics, name='metrics'),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
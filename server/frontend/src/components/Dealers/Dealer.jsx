@@ -20,34 +20,22 @@ const Dealer = () => {
     let id = params.id;
     let root_url = window.location.origin; 
     
-    let dealer_url = root_url + `/djangoapp/dealer/${id}`;
-    let reviews_url = root_url + `/djangoapp/reviews/dealer/${id}`;
+    let dealer_page_url = root_url + `/djangoapp/dealer/${id}/page`;
     let post_review_link = root_url + `/postreview/${id}`;
     
     // --- API Fetch Functions ---
 
-    const get_dealer = async () => {
-        const res = await fetch(dealer_url, {
+    // One request returns dealer details plus reviews with sentiment labels
+    const get_dealer_page = async () => {
+        const res = await fetch(dealer_page_url, {
             method: "GET"
         });
         const retobj = await res.json();
 
         // Check for correct status code AND if the expected 'dealer' key exists
         if (retobj.status === 200 && retobj.dealer) {
-            // The API returns the dealer object under a 'dealer' key
-            setDealer(retobj.dealer); // Directly set the dealer object
-        }
-    }
-
-    const get_reviews = async () => {
-        const res = await fetch(reviews_url, {
-            method: "GET"
-        });
-        const retobj = await res.json();
-
-        // Check for correct status code AND if the expected 'reviews' key exists
-        if (retobj.status === 200 && retobj.reviews) {
-            if (retobj.reviews.length > 0) {
+            setDealer(retobj.dealer);
+            if (retobj.reviews && retobj.reviews.length > 0) {
                 setReviews(retobj.reviews)
             } else {
                 setUnreviewed(true);
@@ -64,8 +52,7 @@ const Dealer = () => {
 
     // --- Effect Hook ---
     useEffect(() => {
-        get_dealer();
-        get_reviews();
+        get_dealer_page();
         
         // Only show "Post Review" button if the user is logged in
         if (sessionStorage.getItem("username")) {
@@ -58,7 +58,8 @@ const PostReview = () => {
         });
 
         const json = await res.json();
-        if (json.status === 200) {
+        // 202: accepted and queued for delivery to the backend
+        if (json.status === 200 || json.status === 202) {
             window.location.href = window.location.origin + "/dealer/" + id;
         } else {
             alert("Review submission failed: " + json.message);